@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from api.models import User, Project, Task, Comment, Notification, ActivityLog
+from api.models import User, Project, Task, TaskTransition, Comment, Notification, ActivityLog, NotificationEvent, ActivityDailyCount
 
 
 @admin.register(User)
@@ -128,3 +128,23 @@ class ActivityLogAdmin(admin.ModelAdmin):
         }),
     )
 
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'actor', 'status', 'attempts', 'available_at', 'created_at']
+    list_filter = ['event_type', 'status']
+    readonly_fields = ['created_at']
+
+
+@admin.register(ActivityDailyCount)
+class ActivityDailyCountAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'project', 'day', 'action_type', 'count']
+    list_filter = ['action_type', 'day']
+    search_fields = ['user__username', 'project__title']
+
+
+@admin.register(TaskTransition)
+class TaskTransitionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'from_status', 'to_status', 'assigned_to', 'changed_by', 'created_at']
+    list_filter = ['to_status', 'created_at']
+    search_fields = ['task__title']
@@ -0,0 +1,110 @@
+"""
+Token authentication with an in-process cache.
+
+DRF's TokenAuthentication looks the token and its user up on every request.
+CachedTokenAuthentication keeps resolved tokens in a bounded LRU with a TTL
+(TOKEN_AUTH_CACHE_SIZE entries, TOKEN_AUTH_CACHE_TTL seconds), so repeat
+calls authenticate without touching the database.
+
+Changing a user's credentials, status or profile, or deleting their token,
+bumps their ('user-auth', id) data version (api.services.versions; views
+call `invalidate_user()`, api.signals covers model saves and token
+deletes). With a shared cache every hit checks that version, so a revoked
+token stops working in every process at once. On a per-process cache other
+processes only notice when their entry expires, which is why the TTL
+defaults to a few seconds without REDIS_URL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from api.services.versions import bump_on_commit, get_version, is_shared
+
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 5  # seconds
+
+
+class TokenCache:
+    """Thread-safe LRU of token key -> (user, token, auth version, expires_at)"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[:3]
+
+    def set(self, key, user, token, version=None):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (user, token, version, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        user = self._entries.pop(key)[0]
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+
+token_cache = TokenCache(
+    getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+    getattr(settings, 'TOKEN_AUTH_CACHE_TTL', DEFAULT_CACHE_TTL)
+)
+
+
+def invalidate_user(user_id):
+    """Forget every cached token of a user (password, status or profile change)"""
+    token_cache.invalidate_user(user_id)
+    # Other processes' entries, once the change commits
+    bump_on_commit('user-auth', user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """`Authorization: Token <key>`, resolved from the in-process cache when possible"""
+
+    def authenticate_credentials(self, key):
+        shared = is_shared()
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token, version = cached
+            if not shared or get_version('user-auth', user.pk) == version:
+                # Views may modify request.user; never hand out the shared instance
+                return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        version = get_version('user-auth', user.pk) if shared else None
+        token_cache.set(key, copy.copy(user), token, version)
+        return user, token
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from api.db_routers import replica_alias
+from api.services.versions import is_shared
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """Features that need every process to see the same cache"""
+    if is_shared():
+        return []
+    errors = []
+    if replica_alias() is not None:
+        errors.append(Warning(
+            'A read replica is configured but the default cache is per process.',
+            hint='Reads stay on the primary because replica stickiness needs a shared '
+                 'cache. Set REDIS_URL.',
+            id='api.W001',
+        ))
+    if settings.SESSION_ENGINE == 'api.sessions':
+        errors.append(Warning(
+            "SESSION_MODE is 'cache' but the default cache is per process.",
+            hint='A session ended in one process stays valid in the others until its '
+                 'cached copy expires. Set REDIS_URL or use another SESSION_MODE.',
+            id='api.W002',
+        ))
+    return errors
@@ -0,0 +1,137 @@
+"""
+Read-replica routing.
+
+Views opt in with `ReplicaReadsMixin` (list/retrieve actions and other
+read-only `replica_actions`) or the `replica_reads` decorator; all other
+traffic stays on the primary. Reads are sent to DATABASE_REPLICA_ALIAS only
+when that alias is configured, and never:
+
+- after the current request has written anything, and
+- for REPLICA_STICKY_SECONDS after the same user last wrote, so people see
+  their own changes even while the replica lags. The marker lives in the
+  shared default cache (see CACHES in settings).
+
+Without a shared cache the marker would only be seen by the process that
+set it, so reads stay on the primary.
+
+ReplicaRoutingMiddleware scopes the state to one request.
+"""
+import contextlib
+import contextvars
+import functools
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from api.services.versions import is_shared
+
+
+DEFAULT_REPLICA_ALIAS = 'replica'
+DEFAULT_STICKY_SECONDS = 10
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none"""
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', DEFAULT_REPLICA_ALIAS)
+    return alias if alias in settings.DATABASES else None
+
+
+def _sticky_key(user_id):
+    return f'db-primary:{user_id}'
+
+
+def begin_request():
+    return _state.set(RoutingState())
+
+
+def end_request(token, user):
+    """Reset the request's state; remember users who wrote"""
+    state = _state.get()
+    _state.reset(token)
+    if state is None or not state.wrote or not is_shared():
+        return
+    if user is not None and user.is_authenticated:
+        cache.set(
+            _sticky_key(user.pk), True,
+            getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+        )
+
+
+def use_replica(user):
+    """Send the rest of this request's reads to the replica, if allowed"""
+    state = _state.get()
+    alias = replica_alias()
+    if state is None or alias is None or state.wrote or not is_shared():
+        return
+    if user is not None and user.is_authenticated and cache.get(_sticky_key(user.pk)):
+        return
+    state.read_alias = alias
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Read from the primary inside the block, e.g. to fill a cache"""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.read_alias = state.read_alias, None
+    try:
+        yield
+    finally:
+        state.read_alias = previous
+
+
+def replica_reads(view):
+    """Decorator for read-only function views (below @api_view)"""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        use_replica(request.user)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadsMixin:
+    """Serve the safe `replica_actions` of a viewset from the replica"""
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and request.method in ('GET', 'HEAD', 'OPTIONS'):
+            use_replica(request.user)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.read_alias is None:
+            return None
+        # Also overrides instance hints: objects loaded from the replica
+        # would otherwise pull their relations from it after a write
+        return DEFAULT_DB_ALIAS if state.wrote else state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,141 @@
+import copy
+import random
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+
+BENCH_TABLE = 'bench_database_rows'
+ALIAS = 'benchmark'
+
+
+def _profiles():
+    """Profiles to compare; 'sqlite-default' is Django's stock SQLite setup"""
+    profiles = copy.deepcopy(settings.DATABASE_PROFILES)
+    baseline = {'ENGINE': profiles['sqlite']['ENGINE'], 'NAME': profiles['sqlite']['NAME']}
+    return {'sqlite-default': baseline, **profiles}
+
+
+class Command(BaseCommand):
+    help = 'Measure read/write throughput of each DATABASE_PROFILE with concurrent readers and writers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(_profiles()),
+                            default=['sqlite-default', 'sqlite'])
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration per profile')
+        parser.add_argument('--rows', type=int, default=10000, help='Rows seeded before measuring')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'profile':<16}{'reads/s':>10}{'writes/s':>10}{'errors':>8}{'reads':>9}{'writes':>9}")
+        baseline = None
+        for name in options['profiles']:
+            config = _profiles()[name]
+            scratch = None
+            if config['ENGINE'] == 'django.db.backends.sqlite3':
+                # Never benchmark on db.sqlite3 itself: WAL mode is persistent
+                scratch = tempfile.mkdtemp()
+                config = {**config, 'NAME': Path(scratch) / 'benchmark.sqlite3'}
+            try:
+                reads, writes, errors = self._measure(config, options)
+            except (DatabaseError, ImproperlyConfigured) as exc:
+                self.stdout.write(f'{name:<16}unavailable: {exc}')
+                continue
+            finally:
+                if scratch:
+                    shutil.rmtree(scratch, ignore_errors=True)
+            seconds = options['seconds']
+            if baseline is None:
+                baseline = (reads, writes)
+            # Relative to the first profile, so a regression in either column shows
+            relative = ''.join(
+                f'{count / base:>8.2f}x' if base else f"{'-':>9}" for count, base in zip((reads, writes), baseline)
+            )
+            self.stdout.write(f'{name:<16}{reads / seconds:>10.0f}{writes / seconds:>10.0f}{errors:>8}{relative}')
+        self.stdout.write(
+            'reads run in autocommit and writes in a transaction, each followed by the end-of-request '
+            'connection check; the last two columns compare each profile with the first'
+        )
+
+    def _measure(self, config, options):
+        configured = connections.configure_settings({DEFAULT_DB_ALIAS: {}, ALIAS: config})
+        connections.settings[ALIAS] = configured[ALIAS]
+        try:
+            rows = options['rows']
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {BENCH_TABLE}')
+                cursor.execute(
+                    f'CREATE TABLE {BENCH_TABLE} (id integer PRIMARY KEY, counter integer NOT NULL, payload varchar(100) NOT NULL)'
+                )
+                cursor.executemany(
+                    f'INSERT INTO {BENCH_TABLE} (id, counter, payload) VALUES (%s, 0, %s)',
+                    [(i, 'x' * 100) for i in range(rows)]
+                )
+            connections[ALIAS].close()
+
+            counts = {'reads': 0, 'writes': 0, 'errors': 0}
+            lock = threading.Lock()
+            next_id = iter(range(rows, 2 ** 62))
+            deadline = time.perf_counter() + options['seconds']
+
+            def read():
+                # Autocommit like a read-only request; an IMMEDIATE transaction
+                # would take the write lock
+                with connections[ALIAS].cursor() as cursor:
+                    start = random.randrange(rows)
+                    cursor.execute(f'SELECT id, counter, payload FROM {BENCH_TABLE} WHERE id = %s', [start])
+                    cursor.fetchone()
+                    cursor.execute(f'SELECT COUNT(*), SUM(counter) FROM {BENCH_TABLE} WHERE id BETWEEN %s AND %s',
+                                   [start, start + 100])
+                    cursor.fetchone()
+                return 'reads'
+
+            def write():
+                with lock:
+                    row_id = next(next_id)
+                with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                    cursor.execute(f'UPDATE {BENCH_TABLE} SET counter = counter + 1 WHERE id = %s', [random.randrange(rows)])
+                    cursor.execute(f'INSERT INTO {BENCH_TABLE} (id, counter, payload) VALUES (%s, 0, %s)', [row_id, 'y' * 100])
+                return 'writes'
+
+            def worker(operation):
+                done = {'reads': 0, 'writes': 0, 'errors': 0}
+                try:
+                    while time.perf_counter() < deadline:
+                        try:
+                            done[operation()] += 1
+                        except DatabaseError:
+                            done['errors'] += 1
+                        # What request_finished does after every request
+                        connections[ALIAS].close_if_unusable_or_obsolete()
+                finally:
+                    connections[ALIAS].close()
+                    with lock:
+                        for key, value in done.items():
+                            counts[key] += value
+
+            threads = (
+                [threading.Thread(target=worker, args=(read,)) for _ in range(options['readers'])] +
+                [threading.Thread(target=worker, args=(write,)) for _ in range(options['writers'])]
+            )
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute(f'DROP TABLE {BENCH_TABLE}')
+            return counts['reads'], counts['writes'], counts['errors']
+        finally:
+            for connection in connections.all(initialized_only=True):
+                if connection.alias == ALIAS:
+                    connection.close()
+                    del connections[ALIAS]
+            del connections.settings[ALIAS]
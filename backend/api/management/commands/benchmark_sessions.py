@@ -0,0 +1,82 @@
+import time
+import uuid
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from api.middleware import REFRESHED_AT, SessionRefreshMiddleware
+from api.models import User
+from api.sessions import flush_pending
+
+
+def _view(request):
+    request.user.is_authenticated
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-request overhead of each SESSION_MODE for an authenticated request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000,
+                            help='Requests to time per mode')
+        parser.add_argument('--modes', nargs='+', choices=list(settings.SESSION_ENGINES),
+                            default=list(settings.SESSION_ENGINES))
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f'session-bench-{uuid.uuid4().hex[:8]}')
+        session_keys = []
+        try:
+            self.stdout.write(f"{'mode':<14}{'us/request':>12}{'queries':>10}{'writes':>9}")
+            for mode in options['modes']:
+                with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                    per_request, queries, writes, key = self._measure(user, options['requests'])
+                session_keys.append(key)
+                self.stdout.write(f'{mode:<14}{per_request:>12.1f}{queries:>10.2f}{writes:>9.2f}')
+            self.stdout.write(
+                'queries/writes are per request and include the one user lookup every mode needs'
+            )
+        finally:
+            flush_pending()
+            Session.objects.filter(session_key__in=session_keys).delete()
+            user.delete()
+
+    def _measure(self, user, requests):
+        engine = import_module(settings.SESSION_ENGINE)
+        store = engine.SessionStore()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store[REFRESHED_AT] = int(time.time())
+        store.save()
+
+        handler = SessionMiddleware(AuthenticationMiddleware(SessionRefreshMiddleware(_view)))
+        factory = RequestFactory()
+        counts = {'queries': 0, 'writes': 0}
+
+        def count(execute, sql, params, many, context):
+            counts['queries'] += 1
+            if not sql.lstrip().upper().startswith('SELECT'):
+                counts['writes'] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            for _ in range(requests):
+                request = factory.get('/')
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = store.session_key
+                handler(request)
+            elapsed = time.perf_counter() - started
+
+        return (
+            elapsed / requests * 1e6,
+            counts['queries'] / requests,
+            counts['writes'] / requests,
+            store.session_key,
+        )
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.services import outbox
+
+
+class Command(BaseCommand):
+    help = 'Expand queued notification events into notifications (use with NOTIFICATION_DISPATCH = "worker")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.DEFAULT_BATCH_SIZE,
+                            help='Events claimed per transaction')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            handled = 0
+            while True:
+                count = outbox.dispatch_batch(options['batch_size'])
+                if not count:
+                    break
+                handled += count
+            if handled:
+                self.stdout.write(f'Dispatched {handled} events ({outbox.pending_count()} pending)')
+
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from api.services import retention
+
+
+class Command(BaseCommand):
+    help = 'Drop expired notifications and archive old activity according to RETENTION'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=retention.DEFAULT_BATCH_SIZE,
+                            help='Rows deleted or archived per transaction')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so other writers get the lock')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows each policy would touch')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for label, queryset in retention.expired_notifications():
+                self.stdout.write(f'{label}: {queryset.count()} to delete')
+            self.stdout.write(f'activity: {retention.archivable_activity().count()} to archive')
+            return
+
+        def progress(label, done, total):
+            self.stdout.write(f'  {label}: {total}')
+
+        totals = retention.enforce(options['batch_size'], options['pause'], progress)
+        if totals:
+            summary = ', '.join(f'{count} {label}' for label, count in totals.items())
+            self.stdout.write(self.style.SUCCESS(f'Removed {summary}'))
+        else:
+            self.stdout.write('Nothing past retention')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from api.services import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Create missing profile picture thumbnails (e.g. for pictures uploaded before thumbnails existed)'
+
+    def handle(self, *args, **options):
+        count, failed = thumbnails.backfill()
+        self.stdout.write(self.style.SUCCESS(f'Processed {count} profile pictures'))
+        if failed:
+            self.stdout.write(self.style.WARNING(
+                f"Could not read {len(failed)} profile pictures (user ids: {', '.join(map(str, failed))})"
+            ))
@@ -0,0 +1,30 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.services.user_import import DEFAULT_BATCH_SIZE, import_users
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create users from a CSV file (username, email, password, first_name, last_name, phone, role, projects)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument('--project', type=int, action='append', default=[], dest='projects',
+                            help='Add every imported user to this project (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        try:
+            csv_file = open(options['path'], encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(exc)
+        with csv_file:
+            report = import_users(csv_file, options['projects'], options['batch_size'], options['workers'])
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.created} of {report.rows} users '
+            f'({report.memberships} project memberships, {len(report.errors)} errors)'
+        ))
@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand
+from api.services.purge import DEFAULT_BATCH_SIZE, pending_counts, purge_deleted
+
+
+class Command(BaseCommand):
+    help = 'Remove soft-deleted projects and tasks along with their dependents, in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Maximum rows deleted per transaction')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and purge new deletions as they appear')
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help='Seconds to sleep between passes in --watch mode')
+
+    def handle(self, *args, **options):
+        while True:
+            pending = {label: count for label, count in pending_counts().items() if count}
+            if pending:
+                summary = ', '.join(f'{count} {label}' for label, count in pending.items())
+                self.stdout.write(f'Pending purge: {summary}')
+                totals = purge_deleted(options['batch_size'], progress=self._report(pending))
+                summary = ', '.join(f'{count} {label}' for label, count in totals.items())
+                self.stdout.write(self.style.SUCCESS(f'Purged {summary}'))
+            elif not options['watch']:
+                self.stdout.write('Nothing to purge')
+
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
+
+    def _report(self, pending):
+        def progress(label, deleted, total):
+            expected = pending.get(label)
+            if expected:
+                self.stdout.write(f'  {label}: {total}/{expected}')
+            else:
+                self.stdout.write(f'  {label}: {total}')
+        return progress
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from api.models import Comment, Project, User
+from api.services.mentions import mentioned_usernames, render_content
+
+
+class Command(BaseCommand):
+    help = 'Backfill pre-rendered comment HTML and resolved mention ids'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Comments rendered per query batch')
+        parser.add_argument('--all', action='store_true',
+                            help='Re-render every comment, not only those missing HTML')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Comment.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(content_html='').exclude(content='')
+
+        rendered = 0
+        last_id = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id)
+                .select_related('task')
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            self._render_batch(batch)
+            Comment.objects.bulk_update(batch, ['content_html', 'mentioned_user_ids'])
+            rendered += len(batch)
+            self.stdout.write(f'  rendered {rendered} comments')
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} comments'))
+
+    def _render_batch(self, batch):
+        """Resolve the mentions of a whole batch with a fixed number of queries"""
+        usernames = set()
+        for comment in batch:
+            usernames |= mentioned_usernames(comment.content)
+        users = {user.username: user for user in User.objects.filter(username__in=usernames, is_active=True)}
+
+        project_ids = {comment.task.project_id for comment in batch}
+        creators = dict(Project.all_objects.filter(id__in=project_ids).values_list('id', 'created_by_id'))
+        memberships = set(
+            Project.members.through.objects
+            .filter(project_id__in=project_ids, user_id__in=[user.id for user in users.values()])
+            .values_list('project_id', 'user_id')
+        )
+
+        for comment in batch:
+            project_id = comment.task.project_id
+            visible = [
+                users[username] for username in mentioned_usernames(comment.content)
+                if username in users and (
+                    users[username].role == 'admin'
+                    or creators.get(project_id) == users[username].id
+                    or (project_id, users[username].id) in memberships
+                )
+            ]
+            comment.content_html, comment.mentioned_user_ids = render_content(comment.content, visible)
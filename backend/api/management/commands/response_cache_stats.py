@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+import api.views  # noqa: F401  registers the cached views
+import api.views.report_views  # noqa: F401  and the report views
+from api.services import response_cache, single_flight, versions
+
+
+class Command(BaseCommand):
+    help = 'Show response cache hit ratios and single-flight coalescing per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters afterwards')
+
+    def handle(self, *args, **options):
+        if not versions.is_shared():
+            raise CommandError(
+                'The default cache is per process, so the counters of the web workers are not '
+                'visible here. Set REDIS_URL (see CACHES in settings.py).'
+            )
+        self.stdout.write(f"{'view':<30}{'hits':>9}{'waits':>9}{'misses':>9}{'ratio':>8}")
+        for name, row in response_cache.stats().items():
+            ratio = '-' if row['hit_ratio'] is None else f"{row['hit_ratio']:.1%}"
+            self.stdout.write(f"{name:<30}{row['hits']:>9}{row['waits']:>9}{row['misses']:>9}{ratio:>8}")
+
+        self.stdout.write(f"\n{'single-flight view':<30}{'leaders':>9}{'coalesced':>11}")
+        for name, row in single_flight.stats().items():
+            self.stdout.write(f"{name:<30}{row['leaders']:>9}{row['coalesced']:>11}")
+
+        if options['reset']:
+            response_cache.reset_stats()
+            single_flight.reset_stats()
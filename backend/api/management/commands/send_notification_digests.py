@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api.services.coalescing import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Fold pending notifications of digest users into one summary notification each'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and send digests as they fall due')
+        parser.add_argument('--interval', type=float, default=300.0,
+                            help='Seconds between checks in --watch mode')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent = send_digests()
+            self.stdout.write(f'Sent {sent} digests')
+            if not options['watch']:
+                return
+            time.sleep(options['interval'])
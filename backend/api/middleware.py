@@ -0,0 +1,52 @@
+import time
+from django.conf import settings
+from api import db_routers
+
+
+REFRESHED_AT = '_refreshed_at'
+
+
+class SessionRefreshMiddleware:
+    """
+    Extend active sessions without saving them on every request.
+
+    A session is re-saved (new expiry, new cookie) only once it is within
+    SESSION_REFRESH_WINDOW seconds of expiring; all other requests leave it
+    unmodified, so the session backend only reads. Must come after
+    SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or not session.session_key or session.get_expire_at_browser_close():
+            return response
+
+        now = int(time.time())
+        refreshed_at = session.get(REFRESHED_AT)
+        window = getattr(settings, 'SESSION_REFRESH_WINDOW', 86400)
+        if refreshed_at is None or now - refreshed_at >= settings.SESSION_COOKIE_AGE - window:
+            session[REFRESHED_AT] = now
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Track which database the request may read from (see api.db_routers).
+    Does nothing unless a replica is configured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if db_routers.replica_alias() is None:
+            return self.get_response(request)
+        token = db_routers.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            db_routers.end_request(token, getattr(request, 'user', None))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_project_deleted_at_task_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='content_html',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='mentioned_user_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
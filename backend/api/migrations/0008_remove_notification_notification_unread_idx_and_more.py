@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_notificationevent'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_unread_idx',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='digest_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='notification_digest',
+            field=models.CharField(choices=[('off', 'Off'), ('hourly', 'Hourly'), ('daily', 'Daily')], default='off', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='notification_digest_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('comment', 'New Comment'), ('mention', 'Mentioned in Comment'), ('task_assigned', 'Task Assigned'), ('task_updated', 'Task Updated'), ('project_added', 'Added to Project'), ('digest', 'Digest')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('digest_pending', False), ('is_read', False)), fields=['recipient', '-created_at'], name='notification_unread_idx'),
+        ),
+    ]
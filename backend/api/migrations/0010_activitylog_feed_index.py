@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:09
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def resolve_activity_projects(apps, schema_editor):
+    """Fill in the project of task activity rows logged without one"""
+    ActivityLog = apps.get_model('api', 'ActivityLog')
+    Task = apps.get_model('api', 'Task')
+    ActivityLog.objects.filter(project__isnull=True, task__isnull=False).update(
+        project_id=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('project_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_activitylog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_activity_projects, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='activitylog',
+            name='api_activit_project_552b08_idx',
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='api_activit_project_303b13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-created_at', '-id'], name='api_activit_created_32df64_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_counts(apps, schema_editor):
+    """Aggregate the existing activity log into the daily counters"""
+    ActivityLog = apps.get_model('api', 'ActivityLog')
+    ActivityDailyCount = apps.get_model('api', 'ActivityDailyCount')
+    rows = (
+        ActivityLog.objects.filter(project__isnull=False)
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'project_id', 'day', 'action_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    ActivityDailyCount.objects.bulk_create(
+        (ActivityDailyCount(**row) for row in rows.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_activitylog_feed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('action_type', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('commented', 'Commented'), ('status_changed', 'Status Changed'), ('assigned', 'Assigned')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_counts', to='api.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['project', 'day'], name='api_activit_project_2163f7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project', 'day', 'action_type'), name='activity_daily_count_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:11
+
+import re
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+STATUS_CHANGE = re.compile(r'^changed status from (\w+) to (\w+)$')
+
+
+def backfill_transitions(apps, schema_editor):
+    """
+    Rebuild transitions from 'status_changed' activity descriptions, plus an
+    initial transition per task at its creation time
+    """
+    Task = apps.get_model('api', 'Task')
+    ActivityLog = apps.get_model('api', 'ActivityLog')
+    TaskTransition = apps.get_model('api', 'TaskTransition')
+
+    changes = {}
+    logs = (
+        ActivityLog.objects.filter(action_type='status_changed', task__isnull=False)
+        .order_by('created_at', 'id')
+        .values_list('task_id', 'user_id', 'description', 'created_at')
+    )
+    for task_id, user_id, description, created_at in logs.iterator():
+        match = STATUS_CHANGE.match(description)
+        if match:
+            changes.setdefault(task_id, []).append((match.group(1), match.group(2), user_id, created_at))
+
+    transitions = []
+    tasks = Task.objects.values_list('id', 'project_id', 'assigned_to_id', 'created_by_id', 'status', 'created_at')
+    for task_id, project_id, assigned_to_id, created_by_id, status, created_at in tasks.iterator():
+        history = changes.get(task_id, [])
+        initial = history[0][0] if history else status
+        transitions.append(TaskTransition(
+            task_id=task_id, project_id=project_id, from_status='', to_status=initial,
+            assigned_to_id=assigned_to_id, changed_by_id=created_by_id, created_at=created_at
+        ))
+        for from_status, to_status, user_id, changed_at in history:
+            transitions.append(TaskTransition(
+                task_id=task_id, project_id=project_id, from_status=from_status, to_status=to_status,
+                assigned_to_id=assigned_to_id, changed_by_id=user_id, created_at=changed_at
+            ))
+    TaskTransition.objects.bulk_create(transitions, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_activitydailycount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('to_status', models.CharField(choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_transitions', to='api.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='api.task')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['task', 'created_at'], name='api_tasktra_task_id_9d7a44_idx'), models.Index(fields=['project', 'to_status', 'created_at'], name='api_tasktra_project_602d02_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_thumbnail',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+    ]
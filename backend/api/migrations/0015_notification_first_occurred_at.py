@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:39
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_first_occurred_at(apps, schema_editor):
+    Notification = apps.get_model('api', 'Notification')
+    Notification.objects.update(first_occurred_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_user_profile_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='first_occurred_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_first_occurred_at, migrations.RunPython.noop),
+    ]
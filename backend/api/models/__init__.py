@@ -1,6 +1,9 @@
 from .user import User
 from .project import Project
-from .task import Task
+from .task import Task, TaskTransition
 from .comment import Comment, Notification, ActivityLog
+from .outbox import NotificationEvent
+from .activity_stats import ActivityDailyCount
 
-__all__ = ['User', 'Project', 'Task', 'Comment', 'Notification', 'ActivityLog']
\ No newline at end of file
+__all__ = ['User', 'Project', 'Task', 'TaskTransition', 'Comment', 'Notification', 'ActivityLog', 'NotificationEvent',
+           'ActivityDailyCount']
\ No newline at end of file
@@ -0,0 +1,28 @@
+from django.db import models
+from django.conf import settings
+from .comment import ActivityLog
+
+
+class ActivityDailyCount(models.Model):
+    """
+    Number of activity entries per (user, project, day, action type), kept
+    up to date by the activity writer (api.services.heatmap) so contribution
+    heatmaps never scan ActivityLog. Counts outlive archived activity rows.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_counts')
+    project = models.ForeignKey('Project', on_delete=models.CASCADE, null=True, blank=True, related_name='activity_counts')
+    day = models.DateField()
+    action_type = models.CharField(max_length=20, choices=ActivityLog.ACTION_TYPES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project', 'day', 'action_type'], name='activity_daily_count_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.action_type} x{self.count} on {self.day}"
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from .task import Task
 
 
@@ -10,6 +11,9 @@ class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='comments')
     content = models.TextField()
+    # Rendered once at write time (see api.services.mentions.render_content)
+    content_html = models.TextField(blank=True, default='')
+    mentioned_user_ids = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
@@ -32,6 +36,25 @@ class Comment(models.Model):
         super().save(*args, **kwargs)
 
 
+class NotificationQuerySet(models.QuerySet):
+    def visible_to(self, user_id):
+        """What the bell shows: not held for a digest, task not soft-deleted"""
+        return self.filter(recipient_id=user_id, digest_pending=False).filter(
+            models.Q(task__isnull=True) | models.Q(task__deleted_at__isnull=True)
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from api.realtime import publish_notifications
+        from api.services.unread import invalidate_unread_counts
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_unread_counts(
+            notification.recipient_id for notification in objs
+            if not notification.is_read and not notification.digest_pending
+        )
+        publish_notifications([n for n in objs if not n.digest_pending])
+        return objs
+
+
 class Notification(models.Model):
     """
     Notification model for user alerts
@@ -42,6 +65,7 @@ class Notification(models.Model):
         ('task_assigned', 'Task Assigned'),
         ('task_updated', 'Task Updated'),
         ('project_added', 'Added to Project'),
+        ('digest', 'Digest'),
     ]
 
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
@@ -51,18 +75,42 @@ class Notification(models.Model):
     comment = models.ForeignKey(Comment, on_delete=models.SET_NULL, null=True, blank=True)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
+    # Number of coalesced events this row stands for
+    occurrences = models.PositiveIntegerField(default=1)
+    # Held back for the recipient's next digest (hidden from the bell)
+    digest_pending = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Start of the coalescing window; created_at moves with each merge
+    first_occurred_at = models.DateTimeField(default=timezone.now)
+
+    objects = NotificationQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
-            models.Index(fields=['is_read', '-created_at']),
+            # Backs the unread counter's reconciliation COUNT
+            models.Index(
+                fields=['recipient', '-created_at'],
+                condition=models.Q(is_read=False, digest_pending=False),
+                name='notification_unread_idx',
+            ),
         ]
 
     def __str__(self):
         return f"Notification for {self.recipient.username}: {self.notification_type}"
 
+    def save(self, *args, **kwargs):
+        from api.realtime import publish_notifications
+        from api.services.unread import invalidate_unread_counts
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        # Count and push new notifications to the recipient's open streams
+        if is_new and not self.digest_pending:
+            if not self.is_read:
+                invalidate_unread_counts([self.recipient_id])
+            publish_notifications([self])
+
 
 class ActivityLog(models.Model):
     """
@@ -80,18 +128,27 @@ class ActivityLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activities')
     action_type = models.CharField(max_length=20, choices=ACTION_TYPES)
     task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True, blank=True, related_name='activities')
+    # Always resolved (from the task when not given) so feeds filter on this column alone
     project = models.ForeignKey('Project', on_delete=models.CASCADE, null=True, blank=True, related_name='activities')
     description = models.TextField()
     metadata = models.JSONField(null=True, blank=True)  # Store additional data like old/new values
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Stamped when the entry is logged, not when the buffered writer flushes it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['task', '-created_at']),
-            models.Index(fields=['project', '-created_at']),
+            # Keyset-paged feeds: project_id IN (...) ordered by (-created_at, -id)
+            models.Index(fields=['project', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
             models.Index(fields=['user', '-created_at']),
         ]
 
     def __str__(self):
         return f"{self.user.username} {self.action_type} at {self.created_at}"
+
+    def save(self, *args, **kwargs):
+        if self.project_id is None and self.task_id is not None:
+            self.project_id = self.task.project_id
+        super().save(*args, **kwargs)
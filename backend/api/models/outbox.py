@@ -0,0 +1,39 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class NotificationEvent(models.Model):
+    """
+    Outbox row written in the same transaction as a task/comment change and
+    expanded into Notification rows by the dispatcher (api.services.outbox)
+    """
+    EVENT_TYPES = [
+        ('task_created', 'Task Created'),
+        ('task_updated', 'Task Updated'),
+        ('comment_created', 'Comment Created'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),
+    ]
+
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} by {self.actor_id} ({self.status})"
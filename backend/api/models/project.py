@@ -1,8 +1,11 @@
 from django.db import models
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .soft_delete import SoftDeleteModel
 
 
-class Project(models.Model):
+class Project(SoftDeleteModel):
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
@@ -26,3 +29,15 @@ class Project(models.Model):
 
     def __str__(self):
         return self.title
+
+    def soft_delete(self):
+        """Hide the project and its tasks; dependents are purged in the background"""
+        from api.services.unread import invalidate_for_tasks
+        from .task import Task
+        now = timezone.now()
+        with transaction.atomic():
+            self.deleted_at = now
+            self.save(update_fields=['deleted_at'])
+            self.tasks.update(deleted_at=now)
+            # Notifications on hidden tasks no longer count as unread
+            invalidate_for_tasks(Task.all_objects.filter(project=self))
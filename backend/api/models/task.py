@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from .project import Project
+from .soft_delete import SoftDeleteModel
 
 
-class Task(models.Model):
+class Task(SoftDeleteModel):
     PRIORITY_CHOICES = [
         ('low', 'Low'),
         ('medium', 'Medium'),
@@ -53,5 +55,72 @@ class Task(models.Model):
     class Meta:
         ordering = ['-created_at']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Lets cache invalidation (api.signals) bump a moved task's old project
+        self._loaded_project_id = self.__dict__.get('project_id')
+
     def __str__(self):
         return self.title
+
+    def soft_delete(self):
+        from api.services.unread import invalidate_for_tasks
+        from api.services.versions import bump_on_commit
+        super().soft_delete()
+        bump_on_commit('project', self.project_id)
+        # Notifications on a hidden task no longer count as unread
+        invalidate_for_tasks([self.pk])
+
+
+class TaskTransition(models.Model):
+    """
+    One status change of a task (from_status is blank for the initial status).
+    Moving a task to another project is recorded as a transition into the
+    new project, with from_status equal to to_status when the status did not
+    change. Flow analytics (api.services.flow) read these structured rows
+    instead of parsing 'status_changed' activity descriptions.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='transitions')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='task_transitions')
+    from_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    # Assignee at the time of the change, for per-assignee analytics
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['project', 'to_status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.from_status or '-'} -> {self.to_status}"
+
+    @classmethod
+    def record(cls, task, from_status, changed_by):
+        """Record the task's current status as reached from `from_status`"""
+        from api.services.versions import bump_on_commit
+        bump_on_commit('project', task.project_id)
+        return cls.objects.create(
+            task=task,
+            project_id=task.project_id,
+            from_status=from_status,
+            to_status=task.status,
+            assigned_to_id=task.assigned_to_id,
+            changed_by=changed_by
+        )
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import default_storage
+from django.db.models.functions import Lower
 
 def profile_upload_path(instance, filename):
     return f"profile_pictures/user_{instance.id}/{filename}"
@@ -31,8 +33,66 @@ class User(AbstractUser):
         blank=True,
         null=True
     )
+    # Storage name of the content-hashed thumbnail (api.services.thumbnails)
+    profile_thumbnail = models.CharField(max_length=255, blank=True, default='', editable=False)
+
+    # Fold notifications into a periodic summary instead of one row each
+    notification_digest = models.CharField(
+        max_length=10,
+        choices=[
+            ('off', 'Off'),
+            ('hourly', 'Hourly'),
+            ('daily', 'Daily'),
+        ],
+        default='off'
+    )
+    notification_digest_sent_at = models.DateTimeField(blank=True, null=True)
 
     REQUIRED_FIELDS = ['email']
 
+    class Meta(AbstractUser.Meta):
+        # Prefix search (api.services.user_search) matches ranges on these
+        indexes = [
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaded_picture = self._picture_name()
+
     def __str__(self):
-        return f"{self.username} ({self.role})"
\ No newline at end of file
+        return f"{self.username} ({self.role})"
+
+    def _picture_name(self):
+        # Deferred (.only()) instances must not trigger a query here
+        value = self.__dict__.get('profile_picture')
+        return getattr(value, 'name', value) or ''
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        picture_changed = (
+            (update_fields is None or 'profile_picture' in update_fields)
+            and self._picture_name() != self._loaded_picture
+        )
+        if picture_changed:
+            self.profile_thumbnail = ''
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'profile_thumbnail'}
+        super().save(*args, **kwargs)
+        if picture_changed:
+            self._loaded_picture = self._picture_name()
+            if self._loaded_picture:
+                from api.services import thumbnails
+                thumbnails.schedule(self.pk)
+
+    @property
+    def avatar_url(self):
+        """Thumbnail URL, or the original upload until the thumbnail is ready"""
+        if self.profile_thumbnail:
+            return default_storage.url(self.profile_thumbnail)
+        if self.profile_picture:
+            return self.profile_picture.url
+        return None
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Real-time notification push.
+
+Writers call `publish_notifications` / `publish_unread_changed`; events are
+sent after the surrounding transaction commits so streams never see rows
+that might still roll back. The backend is chosen by the
+NOTIFICATION_BROKER setting.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'NOTIFICATION_BROKER', 'api.realtime.brokers.InProcessBroker')
+        _broker = import_string(path)()
+    return _broker
+
+
+def publish_notifications(notifications):
+    """Announce newly created notifications to their recipients"""
+    ids_by_recipient = {}
+    for notification in notifications:
+        ids_by_recipient.setdefault(notification.recipient_id, []).append(notification.id)
+
+    def send():
+        broker = get_broker()
+        for recipient_id, ids in ids_by_recipient.items():
+            broker.publish(recipient_id, {'type': 'notification', 'ids': ids})
+
+    if ids_by_recipient:
+        transaction.on_commit(send)
+
+
+def publish_unread_changed(user_id):
+    """Tell a user's streams that their unread count changed"""
+    transaction.on_commit(lambda: get_broker().publish(user_id, {'type': 'unread_count'}))
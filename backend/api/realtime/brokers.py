@@ -0,0 +1,223 @@
+"""
+Pub/sub backends for the notification stream.
+
+A broker carries small per-user events (`{'type': 'notification', 'ids': [...]}`
+or `{'type': 'unread_count'}`) from the code that changes notifications to
+the connections streaming them. The stream view loads the actual rows, so
+events stay tiny and backends only have to move ids around.
+"""
+import asyncio
+import contextlib
+import json
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class BaseBroker:
+    """Interface every broker implements"""
+
+    def publish(self, user_id, event):
+        """Deliver `event` to every open stream of `user_id`. Called from sync code."""
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """
+        Start listening for `user_id` and return a subscription: an async
+        iterator of events with an async `aclose()`. Cancelling a pending
+        `__anext__` must leave the subscription usable.
+        """
+        raise NotImplementedError
+
+    async def asubscribe(self, user_id):
+        """`subscribe`, returning once events published from now on are received"""
+        return self.subscribe(user_id)
+
+
+class InProcessSubscription:
+    def __init__(self, broker, user_id, queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def offer(self, event):
+        # A stalled client must not grow memory without bound; it will
+        # resync from the next unread_count event
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def aclose(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Fan-out to streams held by this process. Suitable for a single ASGI
+    worker; with several nodes use a shared backend instead.
+    """
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of subscriptions
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+
+    def subscribe(self, user_id):
+        subscription = InProcessSubscription(self, user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+
+class DatabaseSubscription:
+    def __init__(self, user_id, poll_interval):
+        self.user_id = user_id
+        self.poll_interval = poll_interval
+        self.last_id = None
+        self.unread = None
+        self.pending = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.last_id is None:
+            self.last_id, self.unread = await sync_to_async(self._latest)()
+        while not self.pending:
+            await asyncio.sleep(self.poll_interval)
+            new_ids, unread = await sync_to_async(self._changes)()
+            if new_ids:
+                self.last_id = new_ids[-1]
+                self.pending.append({'type': 'notification', 'ids': new_ids})
+            if unread != self.unread:
+                self.unread = unread
+                self.pending.append({'type': 'unread_count'})
+        return self.pending.pop(0)
+
+    def _notifications(self):
+        from api.models import Notification
+        return Notification.objects.filter(recipient_id=self.user_id, digest_pending=False)
+
+    def _latest(self):
+        latest = self._notifications().order_by('-id').values_list('id', flat=True).first()
+        return latest or 0, self._notifications().filter(is_read=False).count()
+
+    def _changes(self):
+        new_ids = list(
+            self._notifications().filter(id__gt=self.last_id).order_by('id').values_list('id', flat=True)
+        )
+        return new_ids, self._notifications().filter(is_read=False).count()
+
+    async def aclose(self):
+        pass
+
+
+class DatabaseBroker(BaseBroker):
+    """
+    Fallback for a single node whose notifications are also written by
+    another process (e.g. `dispatch_notifications`) when Redis is not
+    available: each open stream polls the recipient index every
+    `poll_interval` seconds for rows newer than the last one it saw, so the
+    database load grows with the number of connections. Publishing is a
+    no-op. Use RedisBroker when running several processes or nodes.
+    """
+    poll_interval = 2.0
+
+    def publish(self, user_id, event):
+        pass
+
+    def subscribe(self, user_id):
+        return DatabaseSubscription(user_id, self.poll_interval)
+
+
+class RedisSubscription:
+    def __init__(self, url, channel, queue_size):
+        from redis import asyncio as aioredis
+        self.client = aioredis.Redis.from_url(url)
+        self.pubsub = self.client.pubsub()
+        self.channel = channel
+        self.queue = asyncio.Queue(queue_size)
+        self.reader = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def start(self, subscribed):
+        self.reader = asyncio.get_running_loop().create_task(self._read(subscribed))
+
+    async def _read(self, subscribed):
+        if not subscribed:
+            await self.pubsub.subscribe(self.channel)
+        async for message in self.pubsub.listen():
+            # As in InProcessSubscription, a stalled client drops events
+            if message['type'] == 'message' and not self.queue.full():
+                self.queue.put_nowait(json.loads(message['data']))
+
+    async def aclose(self):
+        if self.reader is not None:
+            self.reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self.reader
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker(BaseBroker):
+    """
+    Fan-out across processes and nodes through Redis pub/sub on one channel
+    per user (pip install redis; REDIS_URL). Each open stream holds one
+    Redis connection and costs nothing while no events arrive.
+    """
+    queue_size = 100
+
+    def __init__(self):
+        import redis
+        self.url = getattr(settings, 'REDIS_URL', None)
+        if not self.url:
+            raise ImproperlyConfigured('RedisBroker needs REDIS_URL')
+        self.client = redis.Redis.from_url(self.url)
+
+    def _channel(self, user_id):
+        return f'notifications:{user_id}'
+
+    def publish(self, user_id, event):
+        self.client.publish(self._channel(user_id), json.dumps(event))
+
+    def subscribe(self, user_id):
+        subscription = RedisSubscription(self.url, self._channel(user_id), self.queue_size)
+        subscription.start(subscribed=False)
+        return subscription
+
+    async def asubscribe(self, user_id):
+        subscription = RedisSubscription(self.url, self._channel(user_id), self.queue_size)
+        try:
+            await subscription.pubsub.subscribe(subscription.channel)
+        except Exception:
+            await subscription.aclose()
+            raise
+        subscription.start(subscribed=True)
+        return subscription
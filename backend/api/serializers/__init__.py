@@ -1,5 +1,6 @@
 from .user_serializers import (
     UserSerializer, 
+    UserDirectorySerializer,
     UserRegistrationSerializer, 
     UserLoginSerializer,
     UserProfileSerializer
@@ -20,6 +21,7 @@ from .comment_serializers import (
 
 __all__ = [
     'UserSerializer',
+    'UserDirectorySerializer',
     'UserRegistrationSerializer',
     'UserLoginSerializer',
     'UserProfileSerializer',
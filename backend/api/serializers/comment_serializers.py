@@ -3,6 +3,11 @@ from api.models import Comment, Notification, ActivityLog
 from .user_serializers import UserSerializer
 
 
+# Replies embedded in a top-level comment; the rest are paged from
+# /comments/<id>/replies/
+INLINE_REPLY_LIMIT = 3
+
+
 class CommentSerializer(serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     replies = serializers.SerializerMethodField()
@@ -10,19 +15,26 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = ['id', 'task', 'user', 'user_details', 'content', 'created_at', 
-                  'updated_at', 'parent', 'is_edited', 'replies', 'replies_count']
-        read_only_fields = ['user', 'created_at', 'updated_at', 'is_edited']
+        fields = ['id', 'task', 'user', 'user_details', 'content', 'content_html',
+                  'mentioned_user_ids', 'created_at', 'updated_at', 'parent', 'is_edited',
+                  'replies', 'replies_count']
+        read_only_fields = ['user', 'content_html', 'mentioned_user_ids', 'created_at',
+                            'updated_at', 'is_edited']
 
     def get_replies(self, obj):
-        if obj.parent is None:  # Only get replies for top-level comments
-            replies = obj.replies.all()
+        if obj.parent_id is None:  # Only get replies for top-level comments
+            # `inline_replies` is prefetched (already sliced) by CommentViewSet.list
+            replies = getattr(obj, 'inline_replies', None)
+            if replies is None:
+                replies = obj.replies.select_related('user').order_by('created_at', 'id')[:INLINE_REPLY_LIMIT]
             return CommentSerializer(replies, many=True, context=self.context).data
         return []
 
     def get_replies_count(self, obj):
-        if obj.parent is None:
-            return obj.replies.count()
+        if obj.parent_id is None:
+            # `replies_total` is annotated by CommentViewSet.list
+            count = getattr(obj, 'replies_total', None)
+            return count if count is not None else obj.replies.count()
         return 0
 
     def create(self, validated_data):
@@ -37,14 +49,15 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'recipient', 'sender', 'sender_details', 'notification_type', 
-                  'task', 'task_title', 'comment', 'message', 'is_read', 'created_at']
-        read_only_fields = ['created_at']
+                  'task', 'task_title', 'comment', 'message', 'is_read', 'occurrences',
+                  'created_at']
+        read_only_fields = ['occurrences', 'created_at']
 
 
 class ActivityLogSerializer(serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     task_title = serializers.CharField(source='task.title', read_only=True)
-    project_name = serializers.CharField(source='project.name', read_only=True)
+    project_name = serializers.CharField(source='project.title', read_only=True)
 
     class Meta:
         model = ActivityLog
@@ -29,7 +29,7 @@ class ProjectSerializer(serializers.ModelSerializer):
                 'email': obj.created_by.email,
                 'first_name': obj.created_by.first_name,
                 'last_name': obj.created_by.last_name,
-                'profile_picture': obj.created_by.profile_picture.url if obj.created_by.profile_picture else None
+                'profile_picture': obj.created_by.avatar_url
             }
         return None
 
@@ -40,7 +40,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             'email': member.email,
             'first_name': member.first_name,
             'last_name': member.last_name,
-            'profile_picture': member.profile_picture.url if member.profile_picture else None
+            'profile_picture': member.avatar_url
         } for member in obj.members.all()]
 
     def get_task_count(self, obj):
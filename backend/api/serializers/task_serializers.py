@@ -29,7 +29,7 @@ class TaskSerializer(serializers.ModelSerializer):
                 'email': obj.assigned_to.email,
                 'first_name': obj.assigned_to.first_name,
                 'last_name': obj.assigned_to.last_name,
-                'profile_picture': obj.assigned_to.profile_picture.url if obj.assigned_to.profile_picture else None
+                'profile_picture': obj.assigned_to.avatar_url
             }
         return None
 
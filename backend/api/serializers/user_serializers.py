@@ -1,18 +1,38 @@
 from rest_framework import serializers
 from api.models import User
+from api.services.coalescing import send_digest
 from django.contrib.auth import authenticate
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for User model"""
+    # Small, immutable avatar image; falls back to the original until generated
+    profile_thumbnail = serializers.CharField(source='avatar_url', read_only=True)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 
-                  'phone', 'role', 'profile_picture', 'date_joined']
+                  'phone', 'role', 'profile_picture', 'profile_thumbnail', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
 
+class UserDirectorySerializer(UserSerializer):
+    """Admin directory row; the counts are annotated by UserViewSet.get_queryset"""
+    project_count = serializers.IntegerField(read_only=True)
+    task_count = serializers.IntegerField(read_only=True)
+    status = serializers.SerializerMethodField()
+    full_name = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['is_active', 'project_count', 'task_count', 'status', 'full_name']
+
+    def get_status(self, obj):
+        return 'active' if obj.is_active else 'inactive'
+
+    def get_full_name(self, obj):
+        return f"{obj.first_name} {obj.last_name}".strip() or obj.username
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
     password = serializers.CharField(write_only=True, min_length=8)
@@ -90,9 +110,18 @@ class UserLoginSerializer(serializers.Serializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile with more details"""
+    profile_thumbnail = serializers.CharField(source='avatar_url', read_only=True)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 
-                  'phone', 'role', 'profile_picture', 'date_joined', 'last_login']
+                  'phone', 'role', 'profile_picture', 'profile_thumbnail', 'notification_digest',
+                  'date_joined', 'last_login']
         read_only_fields = ['id', 'username', 'date_joined', 'last_login', 'role']
+
+    def update(self, instance, validated_data):
+        user = super().update(instance, validated_data)
+        if user.notification_digest == 'off':
+            # Rows held for a digest would otherwise stay hidden
+            send_digest(user)
+        return user
@@ -0,0 +1,129 @@
+"""
+Buffered activity log writer.
+
+Write paths call `log_activity()` instead of `ActivityLog.objects.create()`.
+Entries are handed to a bounded in-memory queue when the surrounding
+transaction commits (rolled back work is never logged) and a background
+flusher writes them with `bulk_create`, ACTIVITY_LOG_BATCH_SIZE at a time,
+every ACTIVITY_LOG_FLUSH_INTERVAL seconds or as soon as a batch is full.
+Each batch also updates the daily heatmap counters (api.services.heatmap)
+in the same transaction.
+
+When the queue is full the caller waits up to ACTIVITY_LOG_PUT_TIMEOUT
+seconds for the flusher and then writes its entry itself, so a slow
+database slows producers down instead of dropping entries. The flusher is
+drained on interpreter exit.
+
+ACTIVITY_LOG_MODE = 'sync' writes every entry immediately inside the
+caller's transaction instead.
+"""
+import logging
+import queue
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from api.models import ActivityLog
+from . import heatmap
+from .background import BackgroundWorker
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_PUT_TIMEOUT = 2.0
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def log_activity(user, action_type, description, task=None, project=None, metadata=None):
+    """Record an activity entry; it is written once the current transaction commits"""
+    entry = ActivityLog(
+        user=user,
+        action_type=action_type,
+        task=task,
+        # bulk_create skips save(), so resolve the project here as well
+        project_id=project.id if project else (task.project_id if task else None),
+        description=description,
+        metadata=metadata,
+        created_at=timezone.now()
+    )
+    if _setting('ACTIVITY_LOG_MODE', 'buffered') == 'sync':
+        entry.save()
+        heatmap.record([entry])
+    else:
+        transaction.on_commit(lambda: _submit(entry))
+    return entry
+
+
+def _submit(entry):
+    """Queue a committed entry, applying backpressure when the queue is full"""
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        _worker.wake()
+        try:
+            _queue.put(entry, timeout=_setting('ACTIVITY_LOG_PUT_TIMEOUT', DEFAULT_PUT_TIMEOUT))
+        except queue.Full:
+            logger.warning('Activity log queue is full, writing entry synchronously')
+            _write([entry])
+            return
+
+    if _queue.qsize() >= _setting('ACTIVITY_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE):
+        _worker.wake()
+    else:
+        _worker.start()
+
+
+def _write(entries):
+    """Bulk insert entries; fall back to row-by-row so one bad row loses only itself"""
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(entries)
+            heatmap.record(entries)
+    except Exception:
+        logger.exception('Bulk activity log write failed, retrying %d entries one by one', len(entries))
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    entry.pk = None
+                    entry.save()
+                    heatmap.record([entry])
+            except Exception:
+                logger.exception('Dropping activity log entry: %s', entry.description)
+
+
+def flush_batch():
+    """Write up to one batch of queued entries; returns True if a full batch was written"""
+    batch_size = _setting('ACTIVITY_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    entries = []
+    try:
+        while len(entries) < batch_size:
+            entries.append(_queue.get_nowait())
+    except queue.Empty:
+        pass
+
+    if entries:
+        _write(entries)
+    return len(entries) == batch_size
+
+
+def flush():
+    """Write everything queued so far from the calling thread"""
+    while flush_batch():
+        pass
+
+
+def pending_count():
+    """Entries committed but not written yet (approximate)"""
+    return _queue.qsize()
+
+
+_queue = queue.Queue(maxsize=_setting('ACTIVITY_LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+_worker = BackgroundWorker(
+    'activity-log-writer', flush_batch,
+    interval=_setting('ACTIVITY_LOG_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+)
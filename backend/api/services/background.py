@@ -0,0 +1,66 @@
+"""
+In-process background workers.
+
+A worker runs `task()` on a daemon thread whenever it is woken (or every
+`interval` seconds), repeating while `task()` reports it did work. Workers
+are drained on interpreter exit so queued work is not lost on a clean
+shutdown.
+"""
+import atexit
+import logging
+import threading
+from django.db import close_old_connections, connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    def __init__(self, name, task, interval=5.0):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread if needed; it then runs every `interval` seconds"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+                    atexit.register(self.stop)
+
+    def wake(self):
+        """Start the thread if needed and ask it to run soon"""
+        self.start()
+        self._wake.set()
+
+    def stop(self, timeout=10.0):
+        """Run a final pass and wait for the thread to finish"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                self._drain()
+            # Final pass after stop() so pending work is flushed
+            self._drain()
+        finally:
+            connection.close()
+
+    def _drain(self):
+        close_old_connections()
+        try:
+            while self.task():
+                pass
+        except Exception:
+            logger.exception('Background worker %s failed', self.name)
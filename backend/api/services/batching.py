@@ -0,0 +1,14 @@
+from django.db import transaction
+
+
+def delete_batch(queryset, batch_size):
+    """
+    Delete up to `batch_size` rows of `queryset` in their own short
+    transaction, returning how many went
+    """
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    with transaction.atomic():
+        queryset.model._base_manager.filter(pk__in=ids).delete()
+    return len(ids)
@@ -0,0 +1,110 @@
+"""
+Burndown and cumulative-flow series for a project.
+
+Daily status counts are rebuilt by replaying, once in time order, the
+TaskTransition rows of every task that was ever in the project and
+sampling the running counts at the end of each day. A transition into
+another project (a move) takes the task out of the counts, as does its
+deletion from `deleted_at` on; the days before are left as they were.
+
+Results are cached under the project's data version, which is bumped
+whenever one of its tasks changes status, moves or is deleted; on a
+per-process cache (see versions.is_shared) they are rebuilt every time.
+"""
+import heapq
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from api.models import Task, TaskTransition
+from .versions import get_version, is_shared
+
+
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+OPEN_STATUSES = ('todo', 'in_progress')
+
+
+def _end_of_day(day):
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def _events(project_id, until):
+    """(moment, task_id, status in the project or None once it left) in time order"""
+    tasks = TaskTransition.objects.filter(project_id=project_id).values('task_id')
+    transitions = (
+        TaskTransition.objects.filter(task_id__in=tasks, created_at__lt=until)
+        .order_by('created_at', 'id')
+        .values_list('created_at', 'task_id', 'project_id', 'to_status')
+    )
+    deletions = (
+        Task.all_objects.filter(id__in=tasks, deleted_at__lt=until)
+        .order_by('deleted_at', 'id')
+        .values_list('deleted_at', 'id')
+    )
+    return heapq.merge(
+        (
+            (changed_at, task_id, to_status if in_project == project_id else None)
+            for changed_at, task_id, in_project, to_status in transitions.iterator(chunk_size=5000)
+        ),
+        ((deleted_at, task_id, None) for deleted_at, task_id in deletions.iterator(chunk_size=5000)),
+        key=lambda event: event[0],
+    )
+
+
+def daily_status_counts(project_id, start, end):
+    """{status: [count at the end of each day from start to end]}"""
+    days = (end - start).days + 1
+    series = {status: [0] * days for status in STATUSES}
+    counts = dict.fromkeys(STATUSES, 0)
+    current = {}
+    day_index = 0
+    boundary = _end_of_day(start)
+
+    def sample_until(moment):
+        nonlocal day_index, boundary
+        while day_index < days and moment >= boundary:
+            for status in STATUSES:
+                series[status][day_index] = counts[status]
+            day_index += 1
+            boundary += timedelta(days=1)
+
+    for changed_at, task_id, to_status in _events(project_id, _end_of_day(end)):
+        sample_until(changed_at)
+        previous = current.pop(task_id, None)
+        if previous is not None:
+            counts[previous] -= 1
+        if to_status is not None:
+            counts[to_status] += 1
+            current[task_id] = to_status
+    sample_until(_end_of_day(end))
+    return series
+
+
+def project_burndown(project_id, start, end):
+    """Compact chart series for `project_id` between two dates (inclusive)"""
+    key = None
+    if is_shared():
+        key = f'burndown:{project_id}:{get_version("project", project_id)}:{start}:{end}'
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    series = daily_status_counts(project_id, start, end)
+    remaining = [sum(values) for values in zip(*(series[status] for status in OPEN_STATUSES))]
+    days = len(remaining)
+    ideal = [
+        round(remaining[0] * (1 - index / (days - 1)), 2) if days > 1 else remaining[0]
+        for index in range(days)
+    ]
+    result = {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'dates': [(start + timedelta(days=index)).isoformat() for index in range(days)],
+        'statuses': STATUSES,
+        'cumulative_flow': series,
+        'remaining': remaining,
+        'ideal': ideal,
+    }
+    if key is not None:
+        cache.set(key, result, getattr(settings, 'REPORT_CACHE_TIMEOUT', 3600))
+    return result
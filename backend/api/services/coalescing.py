@@ -0,0 +1,141 @@
+"""
+Notification coalescing and digests.
+
+Coalescing: an unread notification of a coalescible type is reused when
+another one for the same recipient, type and task arrives within the
+type's window (NOTIFICATION_COALESCE_WINDOWS). The existing row takes the
+newest message and sender, moves to the top and bumps `occurrences`. The
+window is counted from the row's first occurrence, so steady traffic still
+produces a new row once per window.
+
+Digests: users with `notification_digest` set get their notifications
+stored as `digest_pending` (hidden from the bell) and folded into one
+summary notification per period by the `send_notification_digests` command.
+Rows still pending when a user turns digests off are folded right away.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from api.models import Notification, User
+from .unread import invalidate_unread_counts
+
+
+DEFAULT_WINDOWS = {
+    'task_updated': 3600,
+    'comment': 900,
+}
+
+DIGEST_PERIODS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+
+def _windows():
+    return getattr(settings, 'NOTIFICATION_COALESCE_WINDOWS', DEFAULT_WINDOWS)
+
+
+def _key(notification):
+    return (notification.recipient_id, notification.notification_type,
+            notification.task_id, notification.digest_pending)
+
+
+def coalesce(notifications):
+    """
+    Split unsaved `notifications` into (to_insert, to_update): rows matching
+    a recent unread notification (or an earlier one in the same batch) are
+    merged into it instead of being inserted.
+    """
+    windows = _windows()
+    now = timezone.now()
+    candidates = [n for n in notifications if n.task_id and n.notification_type in windows]
+    if not candidates:
+        return notifications, []
+
+    existing = {}
+    recent = Notification.objects.filter(
+        is_read=False,
+        notification_type__in={n.notification_type for n in candidates},
+        recipient_id__in={n.recipient_id for n in candidates},
+        task_id__in={n.task_id for n in candidates},
+        first_occurred_at__gte=now - timedelta(seconds=max(windows.values())),
+    ).order_by('first_occurred_at')
+    for notification in recent:
+        if notification.first_occurred_at >= now - timedelta(seconds=windows[notification.notification_type]):
+            existing[_key(notification)] = notification
+
+    candidate_ids = {id(n) for n in candidates}
+    to_insert = []
+    to_update = {}
+    for notification in notifications:
+        if id(notification) not in candidate_ids:
+            to_insert.append(notification)
+            continue
+        key = _key(notification)
+        target = existing.get(key)
+        if target is None:
+            existing[key] = notification
+            to_insert.append(notification)
+            continue
+        target.occurrences += 1
+        target.message = notification.message
+        target.sender_id = notification.sender_id
+        target.comment_id = notification.comment_id
+        target.created_at = now
+        if target.pk:
+            to_update[target.pk] = target
+    return to_insert, list(to_update.values())
+
+
+def digest_message(notifications):
+    """One-line summary of a user's pending notifications"""
+    labels = dict(Notification.NOTIFICATION_TYPES)
+    counts = Counter()
+    for notification in notifications:
+        counts[notification.notification_type] += notification.occurrences
+    total = sum(counts.values())
+    parts = ', '.join(f"{count} {labels.get(kind, kind).lower()}" for kind, count in counts.most_common())
+    return f"You have {total} new update{'s' if total != 1 else ''}: {parts}"
+
+
+def send_digest(user, now=None):
+    """
+    Fold the user's pending notifications into one digest notification now.
+    Returns whether there was anything to fold.
+    """
+    with transaction.atomic():
+        pending = list(Notification.objects.filter(recipient=user, digest_pending=True))
+        if not pending:
+            return False
+        Notification.objects.create(
+            recipient=user,
+            notification_type='digest',
+            message=digest_message(pending),
+        )
+        Notification.objects.filter(id__in=[n.id for n in pending]).delete()
+        invalidate_unread_counts([user.pk])
+        user.notification_digest_sent_at = now or timezone.now()
+        user.save(update_fields=['notification_digest_sent_at'])
+    return True
+
+
+def send_digests(now=None):
+    """
+    Fold each due user's pending notifications into a single digest
+    notification. Users who turned digests off are always due. Returns the
+    number of digests created.
+    """
+    now = now or timezone.now()
+    sent = 0
+    # Not filtered on the preference: rows held before an opt-out still count
+    users = User.objects.filter(notifications__digest_pending=True).distinct()
+    for user in users:
+        period = DIGEST_PERIODS.get(user.notification_digest)
+        if (period is not None and user.notification_digest_sent_at
+                and user.notification_digest_sent_at > now - period):
+            continue
+        if send_digest(user, now):
+            sent += 1
+    return sent
@@ -0,0 +1,151 @@
+"""
+Flow analytics over TaskTransition history.
+
+For every task whose latest transition into 'completed' falls in the
+requested window:
+  lead time  = completion - first transition (the task's initial status)
+  cycle time = completion - first move to 'in_progress' (if it ever started)
+
+History is streamed from one ordered query into a compact numpy record
+array (statuses reduced to small codes in SQL). Task boundaries, first
+starts and final completions are then found with array operations, and
+percentiles for every project and assignee come from one sort of the
+columns per grouping.
+"""
+import numpy as np
+from django.db.models import Case, F, IntegerField, Value, When
+from api.models import TaskTransition
+
+
+PERCENTILES = (50, 85, 95)
+CHUNK_SIZE = 5000
+
+OTHER, STARTED, COMPLETED = 0, 1, 2
+HISTORY = np.dtype([
+    ('task', 'i8'), ('project', 'i8'), ('assignee', 'i8'), ('state', 'i1'), ('at', 'f8'),
+])
+
+
+class FlowColumns:
+    """Per completed task: project, assignee (0 when unassigned), lead and cycle seconds"""
+
+    def __init__(self, project=(), assignee=(), lead=(), cycle=()):
+        self.project = np.asarray(project, dtype='i8')
+        self.assignee = np.asarray(assignee, dtype='i8')
+        self.lead = np.asarray(lead, dtype='f8')
+        self.cycle = np.asarray(cycle, dtype='f8')  # NaN when the task never entered in_progress
+
+    def __len__(self):
+        return len(self.project)
+
+
+def load_history(transitions, start, end):
+    """Ordered transitions of the tasks completed between `start` and `end`"""
+    # Project moves that kept the status are not status changes
+    completed = transitions.filter(to_status='completed', created_at__range=(start, end)).exclude(
+        from_status='completed'
+    )
+    rows = (
+        TaskTransition.objects.filter(task_id__in=completed.values('task_id'))
+        .exclude(from_status=F('to_status'))
+        .annotate(state=Case(
+            When(to_status='in_progress', then=Value(STARTED)),
+            When(to_status='completed', then=Value(COMPLETED)),
+            default=Value(OTHER),
+            output_field=IntegerField(),
+        ))
+        .order_by('task_id', 'created_at', 'id')
+        .values_list('task_id', 'project_id', 'assigned_to_id', 'state', 'created_at')
+    )
+    return np.fromiter(
+        (
+            (task_id, project_id, assignee_id or 0, state, changed_at.timestamp())
+            for task_id, project_id, assignee_id, state, changed_at in rows.iterator(chunk_size=CHUNK_SIZE)
+        ),
+        dtype=HISTORY,
+    )
+
+
+def load_columns(transitions, start, end):
+    """Reduce the history of tasks completed between `start` and `end` to columns"""
+    history = load_history(transitions, start, end)
+    if not len(history):
+        return FlowColumns()
+
+    first = np.flatnonzero(np.diff(history['task'], prepend=history['task'][0] - 1))
+    last = np.append(first[1:], len(history)) - 1
+    # Index of each task's first start (len(history) when it never started)
+    starts = np.minimum.reduceat(
+        np.where(history['state'] == STARTED, np.arange(len(history)), len(history)), first
+    )
+    started = starts < len(history)
+    started_at = np.full(len(first), np.nan)
+    started_at[started] = history['at'][starts[started]]
+
+    # Reopened tasks count from their final completion
+    completed_at = history['at'][last]
+    done = (
+        (history['state'][last] == COMPLETED)
+        & (completed_at >= start.timestamp())
+        & (completed_at <= end.timestamp())
+    )
+    return FlowColumns(
+        project=history['project'][last][done],
+        assignee=history['assignee'][last][done],
+        lead=(completed_at - history['at'][first])[done],
+        cycle=(completed_at - started_at)[done],
+    )
+
+
+def grouped_percentiles(keys, values, groups):
+    """
+    Nearest-rank percentiles (hours) of `values` (seconds, NaN ignored) for
+    each of the sorted `groups` of `keys`
+    """
+    valid = ~np.isnan(values)
+    keys, values = keys[valid], values[valid]
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    low = np.searchsorted(keys, groups, side='left')
+    counts = np.searchsorted(keys, groups, side='right') - low
+
+    summaries = [{'count': int(count)} for count in counts]
+    for p in PERCENTILES:
+        # Empty groups point past their slice; their value is not used
+        ranks = np.minimum(low + np.maximum(np.ceil(p / 100 * counts).astype('i8') - 1, 0), len(values) - 1)
+        picked = values[ranks] if len(values) else counts
+        for summary, count, value in zip(summaries, counts, picked):
+            summary[f'p{p}'] = round(float(value) / 3600, 2) if count else None
+    return summaries
+
+
+def _summaries(keys, columns, groups, weeks):
+    """{group: summary} for the tasks of each group"""
+    lead = grouped_percentiles(keys, columns.lead, groups)
+    cycle = grouped_percentiles(keys, columns.cycle, groups)
+    return {
+        int(group): {
+            'lead_time_hours': lead[i],
+            'cycle_time_hours': cycle[i],
+            # Every completed task has a lead time
+            'throughput': lead[i]['count'],
+            'throughput_per_week': round(lead[i]['count'] / weeks, 2),
+        }
+        for i, group in enumerate(groups)
+    }
+
+
+def flow_metrics(transitions, start, end):
+    """
+    Lead/cycle time percentiles and throughput for tasks completed in
+    [start, end], overall and grouped by project and by assignee.
+    Group keys are ids (assignee 0 means unassigned).
+    """
+    columns = load_columns(transitions, start, end)
+    weeks = max((end - start).total_seconds() / (7 * 86400), 1)
+    everything = np.zeros(len(columns), dtype='i8')
+    return {
+        'overall': _summaries(everything, columns, np.zeros(1, dtype='i8'), weeks)[0],
+        'projects': _summaries(columns.project, columns, np.unique(columns.project), weeks),
+        'assignees': _summaries(columns.assignee, columns, np.unique(columns.assignee), weeks),
+    }
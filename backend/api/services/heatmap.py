@@ -0,0 +1,70 @@
+"""
+Contribution heatmaps.
+
+ActivityDailyCount holds one counter per (user, project, day, action type).
+The activity writer calls `record()` with every batch it stores, so reading
+a year of contributions is a single indexed aggregate over at most
+366 x action-types rows per user or project.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from api.models import ActivityDailyCount
+
+
+def record(entries):
+    """Add a batch of written ActivityLog entries to the daily counters"""
+    counts = Counter(
+        (entry.user_id, entry.project_id, timezone.localdate(entry.created_at), entry.action_type)
+        for entry in entries
+        # Heatmaps are per project; the few project-less entries are not counted
+        if entry.project_id is not None
+    )
+    if not counts:
+        return
+
+    with transaction.atomic():
+        ActivityDailyCount.objects.bulk_create([
+            ActivityDailyCount(user_id=user_id, project_id=project_id, day=day, action_type=action_type)
+            for user_id, project_id, day, action_type in counts
+        ], ignore_conflicts=True)
+        for (user_id, project_id, day, action_type), n in counts.items():
+            ActivityDailyCount.objects.filter(
+                user_id=user_id, project_id=project_id, day=day, action_type=action_type
+            ).update(count=F('count') + n)
+
+
+def date_range(year=None):
+    """Calendar `year`, or the 365 days ending today"""
+    if year is not None:
+        return date(year, 1, 1), date(year, 12, 31)
+    end = timezone.localdate()
+    return end - timedelta(days=364), end
+
+
+def contributions(queryset, start, end):
+    """
+    Fold the counters in `queryset` between `start` and `end` into a
+    per-day series (one entry per calendar day) plus per-action totals
+    """
+    rows = (
+        queryset.filter(day__range=(start, end))
+        .values('day', 'action_type')
+        .annotate(total=Sum('count'))
+    )
+    days = [0] * ((end - start).days + 1)
+    by_action = {action_type: 0 for action_type, _ in ActivityDailyCount._meta.get_field('action_type').choices}
+    for row in rows:
+        days[(row['day'] - start).days] += row['total']
+        by_action[row['action_type']] += row['total']
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'total': sum(days),
+        'max': max(days),
+        'days': days,
+        'by_action': by_action,
+    }
@@ -0,0 +1,57 @@
+"""
+@mention parsing, resolution and pre-rendering of comment content.
+
+Comments are rendered once when they are written: the stored HTML is the
+escaped text with each resolvable @mention wrapped in a span carrying the
+user's id, so clients can display it without re-parsing.
+"""
+import re
+from django.db.models import Q
+from django.utils.html import escape
+
+
+MENTION_PATTERN = re.compile(r'@(\w+)')
+
+
+def mentioned_usernames(content):
+    """Distinct usernames mentioned in `content`"""
+    return set(MENTION_PATTERN.findall(content or ''))
+
+
+def resolve_mentions(usernames, project):
+    """
+    Active users among `usernames` who can see `project`'s tasks
+    (members, the creator and admins), resolved in one query.
+    """
+    from api.models import User
+    if not usernames:
+        return User.objects.none()
+    return User.objects.filter(
+        Q(projects=project) | Q(created_projects=project) | Q(role='admin'),
+        username__in=usernames,
+        is_active=True,
+    ).distinct()
+
+
+def render_content(content, users):
+    """
+    Render comment text to sanitized HTML. Returns (html, mentioned_user_ids)
+    where only mentions of `users` are linked.
+    """
+    ids_by_username = {user.username: user.id for user in users}
+    mentioned_ids = []
+    parts = []
+    position = 0
+    for match in MENTION_PATTERN.finditer(content or ''):
+        user_id = ids_by_username.get(match.group(1))
+        if user_id is None:
+            continue
+        parts.append(escape(content[position:match.start()]))
+        parts.append(
+            f'<span class="mention" data-user-id="{user_id}">@{escape(match.group(1))}</span>'
+        )
+        position = match.end()
+        if user_id not in mentioned_ids:
+            mentioned_ids.append(user_id)
+    parts.append(escape((content or '')[position:]))
+    return ''.join(parts), mentioned_ids
@@ -0,0 +1,233 @@
+"""
+Transactional outbox for notifications.
+
+Write paths call `enqueue()` inside their transaction; that single compact
+row is the only notification work a request does. The dispatcher claims
+due events with a lease, expands them into Notification rows (fan-out,
+per-event deduplication and coalescing, see api.services.coalescing) and deletes the events in the same transaction as
+the insert, so a crash can only cause a retry, never a duplicate.
+
+With NOTIFICATION_DISPATCH = 'thread' (the default) a background thread in
+the web process dispatches right after commit; with 'worker' the
+`dispatch_notifications` command does it from its own process.
+"""
+import logging
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from api.models import Comment, Notification, NotificationEvent, Task, User
+from api.realtime import publish_notifications
+from .background import BackgroundWorker
+from .coalescing import coalesce
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(event_type, actor, **payload):
+    """Record a notification event in the current transaction"""
+    event = NotificationEvent.objects.create(event_type=event_type, actor=actor, payload=payload)
+    if getattr(settings, 'NOTIFICATION_DISPATCH', 'thread') == 'thread':
+        transaction.on_commit(_worker.wake)
+    return event
+
+
+def _claim(batch_size):
+    """Lease up to `batch_size` due events to this dispatcher"""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = NotificationEvent.objects.filter(status='pending', available_at__lte=now)
+    ids = list(due.order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    # The conditional UPDATE makes the claim safe against concurrent dispatchers
+    due.filter(id__in=ids).update(claim_token=token, available_at=now + LEASE)
+    return list(NotificationEvent.objects.filter(claim_token=token).select_related('actor'))
+
+
+class _Context:
+    """Rows referenced by a batch of events, loaded with one query per model"""
+
+    def __init__(self, events):
+        task_ids = {event.payload['task'] for event in events if 'task' in event.payload}
+        comment_ids = {event.payload['comment'] for event in events if 'comment' in event.payload}
+        self.comments = Comment.objects.filter(id__in=comment_ids).select_related('task').in_bulk()
+        task_ids |= {comment.task_id for comment in self.comments.values()}
+        # Soft-deleted tasks are excluded, which drops their events
+        self.tasks = Task.objects.filter(id__in=task_ids).in_bulk()
+
+        user_ids = set()
+        for event in events:
+            for key in ('assigned_to', 'old_assigned_to'):
+                if event.payload.get(key):
+                    user_ids.add(event.payload[key])
+        for comment in self.comments.values():
+            user_ids.update(comment.mentioned_user_ids)
+        for task in self.tasks.values():
+            if task.assigned_to_id:
+                user_ids.add(task.assigned_to_id)
+        self.users = User.objects.filter(id__in=user_ids, is_active=True).in_bulk()
+
+
+def _expand_task_created(event, context):
+    task = context.tasks.get(event.payload['task'])
+    if task is None:
+        return []
+    actor = event.actor
+    return [
+        ('task_assigned', event.payload.get('assigned_to'), task, None,
+         f"{actor.get_full_name()} assigned you to task: {task.title}"),
+    ]
+
+
+def _expand_task_updated(event, context):
+    task = context.tasks.get(event.payload['task'])
+    if task is None:
+        return []
+    actor = event.actor
+    payload = event.payload
+    candidates = []
+    if payload.get('old_status') != payload.get('status'):
+        candidates.append((
+            'task_updated', payload.get('assigned_to'), task, None,
+            f"{actor.get_full_name()} changed task status to {payload['status']}: {task.title}"
+        ))
+    if payload.get('old_assigned_to') != payload.get('assigned_to'):
+        candidates.append((
+            'task_assigned', payload.get('assigned_to'), task, None,
+            f"{actor.get_full_name()} assigned you to task: {task.title}"
+        ))
+    return candidates
+
+
+def _expand_comment_created(event, context):
+    comment = context.comments.get(event.payload['comment'])
+    if comment is None or comment.task_id not in context.tasks:
+        return []
+    task = context.tasks[comment.task_id]
+    actor = event.actor
+    candidates = [
+        ('mention', user_id, task, comment, f"{actor.get_full_name()} mentioned you in a comment")
+        for user_id in comment.mentioned_user_ids
+    ]
+    # The assignee gets a comment notification unless a mention already covers them
+    if task.assigned_to_id and task.assigned_to_id not in comment.mentioned_user_ids:
+        candidates.append((
+            'comment', task.assigned_to_id, task, comment,
+            f"{actor.get_full_name()} commented on task: {task.title}"
+        ))
+    return candidates
+
+
+EXPANDERS = {
+    'task_created': _expand_task_created,
+    'task_updated': _expand_task_updated,
+    'comment_created': _expand_comment_created,
+}
+
+
+def _expand(event, context):
+    """Unsaved notifications for one event, deduplicated per (recipient, type)"""
+    notifications = []
+    seen = set()
+    for notification_type, recipient_id, task, comment, message in EXPANDERS[event.event_type](event, context):
+        if not recipient_id or recipient_id == event.actor_id or recipient_id not in context.users:
+            continue
+        if (recipient_id, notification_type) in seen:
+            continue
+        seen.add((recipient_id, notification_type))
+        notifications.append(Notification(
+            recipient_id=recipient_id,
+            sender_id=event.actor_id,
+            notification_type=notification_type,
+            task=task,
+            comment=comment,
+            message=message,
+            digest_pending=context.users[recipient_id].notification_digest != 'off',
+        ))
+    return notifications
+
+
+def _write(notifications, event_ids):
+    """Insert (or coalesce) the notifications and delete their events atomically"""
+    with transaction.atomic():
+        notifications, coalesced = coalesce(notifications)
+        Notification.objects.bulk_create(notifications)
+        if coalesced:
+            Notification.objects.bulk_update(
+                coalesced, ['occurrences', 'message', 'sender', 'comment', 'created_at']
+            )
+            # Coalesced rows stay unread, so only the streams need to hear about them
+            publish_notifications([n for n in coalesced if not n.digest_pending])
+        NotificationEvent.objects.filter(id__in=event_ids).delete()
+
+
+def _record_failures(failed):
+    """Count the attempt and schedule a retry (or give up) in its own transaction"""
+    with transaction.atomic():
+        for event, exc in failed:
+            event.attempts += 1
+            event.last_error = repr(exc)
+            event.claim_token = ''
+            if event.attempts >= MAX_ATTEMPTS:
+                event.status = 'failed'
+            else:
+                event.available_at = timezone.now() + timedelta(seconds=2 ** event.attempts)
+            event.save(update_fields=['attempts', 'last_error', 'claim_token', 'status', 'available_at'])
+
+
+def dispatch_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Expand one batch of due events. Returns the number of events handled.
+
+    The batch is written in one transaction. If that fails, the events are
+    written one by one so a single bad event (e.g. a recipient deleted in
+    the meantime) cannot hold back the rest; whatever fails, in expansion or
+    writing, counts as an attempt of that event.
+    """
+    events = _claim(batch_size)
+    if not events:
+        return 0
+
+    context = _Context(events)
+    expanded = []
+    failed = []
+    for event in events:
+        try:
+            expanded.append((event, _expand(event, context)))
+        except Exception as exc:
+            logger.exception('Failed to expand notification event %s', event.id)
+            failed.append((event, exc))
+
+    try:
+        _write([n for _, notifications in expanded for n in notifications], [event.id for event, _ in expanded])
+    except Exception:
+        logger.exception('Failed to write a batch of %s notification events; retrying them one by one', len(expanded))
+        for event, _ in expanded:
+            try:
+                # Expanded again: the failed attempt may have merged or numbered the rows
+                _write(_expand(event, context), [event.id])
+            except Exception as exc:
+                logger.exception('Failed to write notification event %s', event.id)
+                failed.append((event, exc))
+
+    if failed:
+        _record_failures(failed)
+    return len(events)
+
+
+def pending_count():
+    return NotificationEvent.objects.filter(status='pending').count()
+
+
+def _dispatch_until_idle():
+    return dispatch_batch(getattr(settings, 'NOTIFICATION_DISPATCH_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+
+
+_worker = BackgroundWorker('notification-dispatcher', _dispatch_until_idle)
@@ -0,0 +1,68 @@
+"""
+Background purge of soft-deleted projects and tasks.
+
+Deleting a project through the API only stamps `deleted_at`; the rows and
+everything hanging off them are removed here in small transactions so that
+no single request holds the SQLite write lock for long.
+"""
+from django.db.models import Q
+from api.models import Project, Task, TaskTransition, Comment, Notification, ActivityLog, ActivityDailyCount
+from .batching import delete_batch
+
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _purge_steps():
+    """
+    Ordered (label, queryset) pairs. Leaf rows go first so the collector
+    never has to walk a large cascade when the parent rows are removed.
+    """
+    deleted_tasks = Task.all_objects.filter(
+        Q(deleted_at__isnull=False) | Q(project__deleted_at__isnull=False)
+    )
+    deleted_projects = Project.all_objects.deleted()
+    return [
+        ('notifications', Notification.objects.filter(task__in=deleted_tasks)),
+        ('activity logs', ActivityLog.objects.filter(task__in=deleted_tasks)),
+        ('task transitions', TaskTransition.objects.filter(task__in=deleted_tasks)),
+        ('comment replies', Comment.objects.filter(task__in=deleted_tasks, parent__isnull=False)),
+        ('comments', Comment.objects.filter(task__in=deleted_tasks, parent__isnull=True)),
+        ('tasks', deleted_tasks),
+        ('project activity logs', ActivityLog.objects.filter(project__in=deleted_projects)),
+        ('project activity counts', ActivityDailyCount.objects.filter(project__in=deleted_projects)),
+        ('projects', deleted_projects.filter(tasks__isnull=True)),
+    ]
+
+
+def pending_counts():
+    """Rows still waiting to be purged, keyed by step label"""
+    return {label: queryset.count() for label, queryset in _purge_steps()}
+
+
+def purge_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run one bounded purge pass. Returns (label, deleted) for the first step
+    that had work, or None once nothing soft-deleted is left.
+    """
+    for label, queryset in _purge_steps():
+        deleted = delete_batch(queryset, batch_size)
+        if deleted:
+            return label, deleted
+    return None
+
+
+def purge_deleted(batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Purge everything soft-deleted, one batch per transaction.
+    `progress(label, deleted, total)` is called after each batch.
+    """
+    totals = {}
+    while True:
+        result = purge_batch(batch_size)
+        if result is None:
+            return totals
+        label, deleted = result
+        totals[label] = totals.get(label, 0) + deleted
+        if progress:
+            progress(label, deleted, totals[label])
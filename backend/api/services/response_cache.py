@@ -0,0 +1,175 @@
+"""
+Response cache for read endpoints.
+
+`cached_response` wraps a viewset handler. Entries are keyed by the view,
+the caller's access scope (admins share one, everyone else gets their own,
+`shared=True` views use one for all) and the normalized query parameters.
+Each entry records the data versions (api.services.versions) it was built
+from and is served only while all of them are unchanged; api.signals bumps
+them when projects, tasks, users or memberships change.
+
+Dependencies come from two callables taking (view, request, kwargs):
+`dependencies` lists the scopes known up front; `item_dependencies` may
+query the ids behind the response (e.g. one version per listed project).
+Both are resolved before the response is built, so a write that commits
+while it is being built leaves the entry already stale. Entries are always
+built from the primary: a lagging replica would store old data under the
+current versions.
+
+Stampede protection: on a miss one request per key rebuilds the entry while
+the others wait up to RESPONSE_CACHE_LOCK_WAIT seconds for it. Hits, misses
+and waits are summed per view in process and added to the shared cache
+every CACHE_STATS_FLUSH_INTERVAL seconds (see `stats()` and the
+`response_cache_stats` command). RESPONSE_CACHE_TIMEOUT bounds how long an
+entry lives.
+
+All of this needs the default cache to be shared by every process (see
+`versions.is_shared()`); on a per-process cache the handler runs uncached.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from api.db_routers import primary_reads
+from .background import BackgroundWorker
+from .versions import get_versions, is_shared
+
+
+DEFAULT_TIMEOUT = 300  # seconds
+DEFAULT_LOCK_WAIT = 5.0  # seconds
+POLL_INTERVAL = 0.05  # seconds
+COUNTERS = ('hits', 'misses', 'waits')
+DEFAULT_STATS_FLUSH_INTERVAL = 5.0  # seconds
+
+views = set()
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def access_dependencies(user):
+    """What a user's view of the projects depends on"""
+    if user.role == 'admin':
+        return [('users', 'all'), ('projects', 'all')]
+    return [('users', 'all'), ('user-projects', user.pk)]
+
+
+def access_scope(user):
+    """Callers with the same access scope are shown the same data"""
+    return 'admin' if user.role == 'admin' else f'user:{user.pk}'
+
+
+def request_key(prefix, name, scope, request, kwargs):
+    """Cache key for a view called with the request's normalized query parameters"""
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    params += sorted((f'kwarg:{key}', str(value)) for key, value in kwargs.items())
+    digest = hashlib.sha1(urlencode(params).encode()).hexdigest()
+    return f'{prefix}:{name}:{scope}:{digest}'
+
+
+def count(prefix, name, counter):
+    """Increment a per-view counter (added to the cache by the stats writer)"""
+    with _counts_lock:
+        _counts[f'{prefix}:{name}:{counter}'] += 1
+    _stats_writer.start()
+
+
+def flush_counts():
+    """Add the counts gathered in this process to the shared cache"""
+    with _counts_lock:
+        pending = dict(_counts)
+        _counts.clear()
+    for key, n in pending.items():
+        try:
+            cache.incr(key, n)
+        except ValueError:
+            if not cache.add(key, n, None):
+                cache.incr(key, n)
+    return False
+
+
+def _valid(entry):
+    return entry is not None and get_versions(entry['versions']) == entry['versions']
+
+
+def cached_response(dependencies, item_dependencies=None, shared=False):
+    """Cache the 200 responses of a viewset handler (see module docstring)"""
+    def decorator(handler):
+        name = handler.__qualname__
+        views.add(name)
+
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            if not is_shared():
+                # Other processes' version bumps would never reach this cache
+                return handler(view, request, *args, **kwargs)
+            scope = 'all' if shared else access_scope(request.user)
+            key = request_key('response', name, scope, request, kwargs)
+            entry = cache.get(key)
+            if _valid(entry):
+                count('response-stats', name, 'hits')
+                return Response(entry['data'], headers={'X-Cache': 'hit'})
+
+            lock = f'{key}:lock'
+            wait = getattr(settings, 'RESPONSE_CACHE_LOCK_WAIT', DEFAULT_LOCK_WAIT)
+            if not cache.add(lock, 1, wait):
+                # Someone else is rebuilding this entry; wait for it
+                deadline = time.monotonic() + wait
+                while time.monotonic() < deadline:
+                    time.sleep(POLL_INTERVAL)
+                    entry = cache.get(key)
+                    if _valid(entry):
+                        count('response-stats', name, 'waits')
+                        return Response(entry['data'], headers={'X-Cache': 'hit'})
+                    if cache.get(lock) is None:
+                        break
+                lock = None
+
+            try:
+                with primary_reads():
+                    versions = get_versions(dependencies(view, request, kwargs))
+                    if item_dependencies is not None:
+                        versions.update(get_versions(item_dependencies(view, request, kwargs)))
+                    response = handler(view, request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(
+                        key, {'versions': versions, 'data': response.data},
+                        getattr(settings, 'RESPONSE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+                    )
+                    response['X-Cache'] = 'miss'
+            finally:
+                if lock is not None:
+                    cache.delete(lock)
+            count('response-stats', name, 'misses')
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    """{view: {'hits', 'misses', 'waits', 'hit_ratio'}}; waits count as hits"""
+    flush_counts()
+    names = sorted(views)
+    counts = cache.get_many([f'response-stats:{name}:{counter}' for name in names for counter in COUNTERS])
+    result = {}
+    for name in names:
+        row = {counter: counts.get(f'response-stats:{name}:{counter}', 0) for counter in COUNTERS}
+        total = row['hits'] + row['waits'] + row['misses']
+        row['hit_ratio'] = round((row['hits'] + row['waits']) / total, 3) if total else None
+        result[name] = row
+    return result
+
+
+def reset_stats():
+    cache.delete_many([f'response-stats:{name}:{counter}' for name in views for counter in COUNTERS])
+
+
+_stats_writer = BackgroundWorker(
+    'cache-stats-writer', flush_counts,
+    interval=getattr(settings, 'CACHE_STATS_FLUSH_INTERVAL', DEFAULT_STATS_FLUSH_INTERVAL)
+)
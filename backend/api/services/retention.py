@@ -0,0 +1,231 @@
+"""
+Retention for notifications and activity logs.
+
+Policies come from the RETENTION setting. Expired rows are removed in
+small batches, each in its own short transaction, so enforcement never
+holds the write lock for long. Activity past its archive age is first
+appended to per-month gzip-compressed NDJSON files under
+ACTIVITY_ARCHIVE_DIR, which `read_archive` serves back read-only.
+"""
+import gzip
+import json
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice
+from django.conf import settings
+from django.utils import timezone
+from api.models import ActivityLog, Notification
+from .batching import delete_batch
+from .unread import invalidate_unread_counts
+
+
+DEFAULT_POLICY = {
+    'read_notifications_days': 90,
+    'unread_notifications_days': None,
+    'activity_archive_days': 365,
+}
+
+DEFAULT_BATCH_SIZE = 500
+ARCHIVE_KEEP_MAX = 1000  # newest archived records a NewestFirstArchive keeps from its count
+
+ARCHIVE_MONTH = re.compile(r'^\d{4}-\d{2}$')
+ARCHIVE_NAME = re.compile(r'^activity-(\d{4}-\d{2})\.ndjson\.gz$')
+
+
+def policy():
+    return {**DEFAULT_POLICY, **getattr(settings, 'RETENTION', {})}
+
+
+def archive_dir():
+    return getattr(settings, 'ACTIVITY_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'activity')
+
+
+def _archive_path(month):
+    return os.path.join(archive_dir(), f'activity-{month}.ndjson.gz')
+
+
+def expired_notifications():
+    """(label, queryset) pairs of notifications past their retention"""
+    rules = policy()
+    now = timezone.now()
+    expired = []
+    if rules['read_notifications_days'] is not None:
+        expired.append(('read notifications', Notification.objects.filter(
+            is_read=True,
+            created_at__lt=now - timedelta(days=rules['read_notifications_days']),
+        )))
+    if rules['unread_notifications_days'] is not None:
+        expired.append(('unread notifications', Notification.objects.filter(
+            is_read=False,
+            created_at__lt=now - timedelta(days=rules['unread_notifications_days']),
+        )))
+    return expired
+
+
+def delete_notification_batch(queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """delete_batch for notifications; recounts the recipients of unread ones"""
+    rows = list(queryset.values_list('pk', 'recipient_id', 'is_read')[:batch_size])
+    deleted = delete_batch(Notification.objects.filter(pk__in=[pk for pk, _, _ in rows]), batch_size)
+    invalidate_unread_counts(recipient_id for _, recipient_id, is_read in rows if not is_read)
+    return deleted
+
+
+def archivable_activity():
+    rules = policy()
+    if rules['activity_archive_days'] is None:
+        return ActivityLog.objects.none()
+    cutoff = timezone.now() - timedelta(days=rules['activity_archive_days'])
+    return ActivityLog.objects.filter(created_at__lt=cutoff)
+
+
+def _archive_record(activity):
+    task = activity.task
+    project_id = activity.project_id or (task.project_id if task else None)
+    return {
+        'id': activity.id,
+        'user': activity.user_id,
+        'username': activity.user.username,
+        'action_type': activity.action_type,
+        'task': activity.task_id,
+        'task_title': task.title if task else None,
+        'project': project_id,
+        'description': activity.description,
+        'metadata': activity.metadata,
+        'created_at': activity.created_at.isoformat(),
+    }
+
+
+def archive_activity_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Append the oldest batch of archivable activity to its monthly files and
+    delete it. The file is written and synced before the rows go, so a crash
+    can only duplicate archived records (readers dedupe by id), never lose them.
+    """
+    batch = list(
+        archivable_activity()
+        .select_related('user', 'task')
+        .order_by('created_at', 'id')[:batch_size]
+    )
+    if not batch:
+        return 0
+
+    by_month = {}
+    for activity in batch:
+        by_month.setdefault(activity.created_at.strftime('%Y-%m'), []).append(_archive_record(activity))
+
+    os.makedirs(archive_dir(), exist_ok=True)
+    for month, records in by_month.items():
+        # Each append is a separate gzip member; gzip readers concatenate them
+        with open(_archive_path(month), 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                for record in records:
+                    archive.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    return delete_batch(ActivityLog.objects.filter(id__in=[activity.id for activity in batch]), batch_size)
+
+
+def enforce(batch_size=DEFAULT_BATCH_SIZE, pause=0.0, progress=None):
+    """
+    Apply every policy until nothing is left, sleeping `pause` seconds
+    between batches to let other writers in. Returns totals per label.
+    """
+    steps = [
+        (label, lambda q=queryset: delete_notification_batch(q, batch_size))
+        for label, queryset in expired_notifications()
+    ]
+    steps.append(('archived activity', lambda: archive_activity_batch(batch_size)))
+
+    totals = {}
+    for label, run_batch in steps:
+        while True:
+            done = run_batch()
+            if not done:
+                break
+            totals[label] = totals.get(label, 0) + done
+            if progress:
+                progress(label, done, totals[label])
+            if pause:
+                time.sleep(pause)
+    return totals
+
+
+def archive_months():
+    """Months (YYYY-MM) that have an archive file, newest first"""
+    try:
+        names = os.listdir(archive_dir())
+    except FileNotFoundError:
+        return []
+    return sorted((m.group(1) for m in map(ARCHIVE_NAME.match, names) if m), reverse=True)
+
+
+def read_archive(month, project_ids=None, task_id=None, user_id=None):
+    """
+    Yield archived activity records of `month`, optionally restricted to
+    `project_ids` (an access scope) and a task or user, without duplicates.
+
+    Batches are appended in (created_at, id) order, and a batch appended
+    again after a crash starts at or before the last key already written.
+    So any record whose key is not above the last one yielded is a
+    duplicate, and deduping needs no memory beyond that key.
+    """
+    path = _archive_path(month)
+    if not os.path.exists(path):
+        return
+    last = None
+    with gzip.open(path, 'rt') as archive:
+        for line in archive:
+            record = json.loads(line)
+            key = (datetime.fromisoformat(record['created_at']), record['id'])
+            if last is not None and key <= last:
+                continue
+            last = key
+            if project_ids is not None and record['project'] not in project_ids:
+                continue
+            if task_id is not None and record['task'] != task_id:
+                continue
+            if user_id is not None and record['user'] != user_id:
+                continue
+            yield record
+
+
+class NewestFirstArchive:
+    """
+    read_archive() results newest first, as a sequence for pagination.
+    len() counts the matches in one pass over the file and keeps the newest
+    `keep` of them (at most ARCHIVE_KEEP_MAX). A page within those is served
+    without reading the file again, so pass the end of the requested page.
+    Pages further back stream the file a second time. Memory never exceeds
+    the kept records plus one page.
+    """
+
+    def __init__(self, month, keep=0, **filters):
+        self.month = month
+        self.filters = filters
+        self._count = None
+        self._newest = deque(maxlen=min(keep, ARCHIVE_KEEP_MAX))
+
+    def __len__(self):
+        if self._count is None:
+            self._count = 0
+            for record in read_archive(self.month, **self.filters):
+                self._count += 1
+                self._newest.append(record)
+        return self._count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError('NewestFirstArchive only supports contiguous slices')
+        start, stop, _ = index.indices(len(self))
+        if start >= stop:
+            return []
+        if stop <= len(self._newest):
+            return list(reversed(self._newest))[start:stop]
+        # The file is oldest first: newest-first [start, stop) is [n - stop, n - start) reversed
+        records = list(islice(read_archive(self.month, **self.filters), len(self) - stop, len(self) - start))
+        records.reverse()
+        return records
@@ -0,0 +1,150 @@
+"""
+Single-flight request coalescing.
+
+`single_flight` wraps an expensive read handler. Identical requests - same
+view, access scope and normalized query parameters - that arrive while one
+of them is being computed wait for that computation and get a copy of its
+response (marked `X-Coalesced: 1`) instead of running their own queries.
+
+Within a process the flights are shared between threads. With
+SINGLE_FLIGHT_CROSS_PROCESS (the default) the leader also holds a lock in
+the shared cache and publishes its result there, so followers in other
+worker processes wait for it too. On a per-process cache (see
+`versions.is_shared()`) that is impossible and coalescing stays
+within the process. A follower that waits longer than SINGLE_FLIGHT_TIMEOUT,
+or whose leader failed, computes the response itself. Only in-flight work
+is shared: nothing is served after the leader has finished.
+
+Leaders and coalesced requests are counted per view like the response
+cache statistics (`response_cache_stats`).
+"""
+import functools
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .response_cache import access_scope, count, flush_counts, request_key
+from .versions import is_shared
+
+
+DEFAULT_TIMEOUT = 30.0  # seconds
+POLL_INTERVAL = 0.05  # seconds
+COUNTERS = ('leaders', 'coalesced')
+
+views = set()
+
+_flights = {}
+_lock = threading.Lock()
+
+
+class Flight:
+    """One in-progress computation; `result` is (data, status) once it succeeded"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+def _timeout():
+    return getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _replay(name, result):
+    count('flight-stats', name, 'coalesced')
+    data, status = result
+    return Response(data, status=status, headers={'X-Coalesced': '1'})
+
+
+def _wait_elsewhere(key):
+    """Result of another process's flight for `key`, or None"""
+    deadline = time.monotonic() + _timeout()
+    while time.monotonic() < deadline:
+        token = cache.get(f'{key}:lock')
+        if token is None:
+            return None
+        time.sleep(POLL_INTERVAL)
+        result = cache.get(f'{key}:result:{token}')
+        if result is not None:
+            return result
+    return None
+
+
+def _lead(name, key, compute):
+    """Run the computation, publishing it to other processes if enabled"""
+    if not (getattr(settings, 'SINGLE_FLIGHT_CROSS_PROCESS', True) and is_shared()):
+        count('flight-stats', name, 'leaders')
+        response = compute()
+        return response, (response.data, response.status_code)
+
+    token = uuid.uuid4().hex
+    if not cache.add(f'{key}:lock', token, _timeout()):
+        result = _wait_elsewhere(key)
+        if result is not None:
+            return None, result
+        token = None
+    try:
+        count('flight-stats', name, 'leaders')
+        response = compute()
+        result = (response.data, response.status_code)
+        if token is not None:
+            cache.set(f'{key}:result:{token}', result, _timeout())
+        return response, result
+    finally:
+        if token is not None:
+            cache.delete(f'{key}:lock')
+
+
+def single_flight(scope=None):
+    """
+    Coalesce identical concurrent calls of a view handler. `scope(request)`
+    says whose callers may share a response (default: access_scope).
+    """
+    def decorator(handler):
+        name = handler.__qualname__
+        views.add(name)
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            caller = scope(request) if scope is not None else access_scope(request.user)
+            key = request_key('flight', name, caller, request, kwargs)
+
+            with _lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = Flight()
+            if not leader:
+                if flight.done.wait(_timeout()) and flight.result is not None:
+                    return _replay(name, flight.result)
+                return handler(*args, **kwargs)
+
+            try:
+                response, flight.result = _lead(name, key, lambda: handler(*args, **kwargs))
+            finally:
+                with _lock:
+                    del _flights[key]
+                flight.done.set()
+            if response is None:
+                return _replay(name, flight.result)
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    """{view: {'leaders', 'coalesced'}}"""
+    flush_counts()
+    names = sorted(views)
+    counts = cache.get_many([f'flight-stats:{name}:{counter}' for name in names for counter in COUNTERS])
+    return {
+        name: {counter: counts.get(f'flight-stats:{name}:{counter}', 0) for counter in COUNTERS}
+        for name in names
+    }
+
+
+def reset_stats():
+    cache.delete_many([f'flight-stats:{name}:{counter}' for name in views for counter in COUNTERS])
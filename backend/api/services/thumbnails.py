@@ -0,0 +1,117 @@
+"""
+Profile picture thumbnails.
+
+Saving a user with a new profile picture schedules it here (after commit).
+A background worker crops it to a PROFILE_THUMBNAIL_SIZE square, encodes it
+as PROFILE_THUMBNAIL_FORMAT and stores it as thumbnails/<sha256>.<ext>.
+Because the name is derived from the bytes, a URL always refers to the same
+image and can be cached forever (see api.views.media_views). Until the
+thumbnail exists, `User.avatar_url` falls back to the original upload.
+"""
+import hashlib
+import io
+import logging
+import threading
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+from .background import BackgroundWorker
+from .versions import bump_version
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+DEFAULT_SIZE = 128
+DEFAULT_FORMAT = 'WEBP'
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+_queue = set()
+_lock = threading.Lock()
+
+
+def schedule(user_id):
+    """Generate the user's thumbnail once the current transaction commits"""
+    def enqueue():
+        with _lock:
+            _queue.add(user_id)
+        _worker.wake()
+    transaction.on_commit(enqueue)
+
+
+def render(source):
+    """Thumbnail bytes for an open image file"""
+    size = getattr(settings, 'PROFILE_THUMBNAIL_SIZE', DEFAULT_SIZE)
+    image_format = getattr(settings, 'PROFILE_THUMBNAIL_FORMAT', DEFAULT_FORMAT)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image_format == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        output = io.BytesIO()
+        thumbnail.save(output, image_format, quality=85)
+    return output.getvalue()
+
+
+def store(content):
+    """Save thumbnail bytes under their content hash; returns the storage name"""
+    image_format = getattr(settings, 'PROFILE_THUMBNAIL_FORMAT', DEFAULT_FORMAT)
+    digest = hashlib.sha256(content).hexdigest()
+    name = f'{THUMBNAIL_DIR}/{digest}.{EXTENSIONS[image_format]}'
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def generate(user_id):
+    from api.models import User
+    user = User.objects.filter(pk=user_id).only('profile_picture').first()
+    if user is None or not user.profile_picture:
+        return
+    picture = user.profile_picture.name
+    with user.profile_picture.open('rb') as source:
+        name = store(render(source))
+    # Skip if the picture was replaced meanwhile; its own job will run
+    if User.objects.filter(pk=user_id, profile_picture=picture).update(profile_thumbnail=name):
+        # Cached responses embed avatar URLs (api.signals covers saves only)
+        bump_version('users', 'all')
+
+
+def process_batch():
+    with _lock:
+        user_ids = list(_queue)
+        _queue.clear()
+    for user_id in user_ids:
+        try:
+            generate(user_id)
+        except Exception:
+            logger.exception('Could not create a thumbnail for user %s', user_id)
+    return False
+
+
+def backfill():
+    """
+    Generate thumbnails for every user that has a picture but none yet.
+    Returns (processed, failed user ids); an unreadable picture is logged
+    and skipped like in process_batch.
+    """
+    from api.models import User
+    user_ids = list(
+        User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        .filter(profile_thumbnail='').values_list('id', flat=True)
+    )
+    failed = []
+    for user_id in user_ids:
+        try:
+            generate(user_id)
+        except Exception:
+            logger.exception('Could not create a thumbnail for user %s', user_id)
+            failed.append(user_id)
+    return len(user_ids) - len(failed), failed
+
+
+_worker = BackgroundWorker('thumbnail-generator', process_batch)
@@ -0,0 +1,61 @@
+"""
+Per-user unread notification counters.
+
+The count is a COUNT over the partial index on unread rows. With a shared
+cache (Redis) it is stored together with the user's ('unread', id) data
+version (api.services.versions), and a read fetches both in one round
+trip. Every change to a user's unread rows bumps that version once it
+commits, and the next read recounts. A count computed while a change
+commits is stored with the version read before it, which the bump makes
+stale, so a stale count is never served for the current version.
+
+On a per-process cache other processes' bumps would never be seen, so
+every read runs the indexed COUNT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from .versions import bump_on_commit, get_versioned, is_shared
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _timeout():
+    return getattr(settings, 'NOTIFICATION_UNREAD_CACHE_TIMEOUT', 300)
+
+
+def count_unread(user_id):
+    """Authoritative count from the database"""
+    from api.models import Notification
+    return Notification.objects.filter(
+        Q(task__isnull=True) | Q(task__deleted_at__isnull=True),
+        recipient_id=user_id,
+        is_read=False,
+        digest_pending=False,
+    ).count()
+
+
+def get_unread_count(user_id):
+    if not is_shared():
+        return count_unread(user_id)
+    # The version is read first: a change committing after this point bumps it
+    count, version = get_versioned(_key(user_id), 'unread', user_id)
+    if count is None:
+        count = count_unread(user_id)
+        cache.set(_key(user_id), (version, count), _timeout())
+    return count
+
+
+def invalidate_unread_counts(user_ids):
+    """Have the users' counts recounted once the current transaction commits"""
+    for user_id in set(user_ids):
+        bump_on_commit('unread', user_id)
+
+
+def invalidate_for_tasks(tasks):
+    """Drop the counters of everyone with unread notifications on `tasks`"""
+    from api.models import Notification
+    recipients = Notification.objects.filter(task__in=tasks, is_read=False).values_list('recipient_id', flat=True)
+    invalidate_unread_counts(recipients.distinct())
@@ -0,0 +1,251 @@
+"""
+Streaming bulk user import from CSV.
+
+Rows are read lazily and handled in batches of `batch_size`:
+
+1. each row is validated on its own (required fields, formats, role,
+   password length) and against earlier rows of the file;
+2. usernames and emails of the batch are checked against the database with
+   one query each;
+3. passwords are hashed, across a process pool when `workers` > 1 (the
+   command's default; hashing dominates the cost);
+4. the valid rows are inserted with `bulk_create` and, optionally, added to
+   projects with one bulk insert into the membership table.
+
+A bad row is reported with its line number and never aborts the batch.
+
+Columns: username, email (required), password, first_name, last_name,
+phone, role ('user' or 'admin', default 'user'), projects (ids separated
+by ';'). Rows without a password get an unusable one.
+"""
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from api.models import Project, User
+from .versions import bump_on_commit
+
+
+DEFAULT_BATCH_SIZE = 500
+MIN_PASSWORD_LENGTH = 8
+ROLES = {role for role, _ in User._meta.get_field('role').choices}
+
+_validate_username = UnicodeUsernameValidator()
+
+
+def hash_password(raw):
+    return make_password(raw)
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.memberships = 0
+        self.errors = []
+
+    def error(self, line, messages):
+        self.errors.append({'line': line, 'errors': messages})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'memberships': self.memberships,
+            'errors': self.errors,
+        }
+
+
+def _clean(row):
+    """(values, project_ids, errors) for one CSV row"""
+    values = {
+        key: (row.get(key) or '').strip()
+        for key in ('username', 'email', 'password', 'first_name', 'last_name', 'phone', 'role')
+    }
+    values['email'] = User.objects.normalize_email(values['email'])
+    values['role'] = values['role'] or 'user'
+    errors = {}
+
+    if not values['username']:
+        errors['username'] = 'This field is required.'
+    else:
+        try:
+            _validate_username(values['username'])
+        except ValidationError as exc:
+            errors['username'] = ' '.join(exc.messages)
+    if not values['email']:
+        errors['email'] = 'This field is required.'
+    else:
+        try:
+            validate_email(values['email'])
+        except ValidationError as exc:
+            errors['email'] = ' '.join(exc.messages)
+    if values['role'] not in ROLES:
+        errors['role'] = f"Must be one of: {', '.join(sorted(ROLES))}."
+    if values['password'] and len(values['password']) < MIN_PASSWORD_LENGTH:
+        errors['password'] = f'Must be at least {MIN_PASSWORD_LENGTH} characters.'
+
+    project_ids = set()
+    for value in (row.get('projects') or '').split(';'):
+        value = value.strip()
+        if value:
+            if value.isdigit():
+                project_ids.add(int(value))
+            else:
+                errors['projects'] = 'Project ids must be integers separated by ";".'
+    return values, project_ids, errors
+
+
+class UserImporter:
+    """Import users from CSV rows; use as a context manager to release the process pool"""
+
+    def __init__(self, project_ids=(), batch_size=DEFAULT_BATCH_SIZE, workers=None):
+        self.project_ids = set(project_ids)
+        self.batch_size = batch_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.report = ImportReport()
+        self._seen_usernames = set()
+        self._seen_emails = set()
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            # spawn: forking a process with live threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def run(self, lines):
+        """Import every row of a CSV given as an iterable of text lines"""
+        reader = csv.DictReader(lines)
+        missing = {'username', 'email'} - set(reader.fieldnames or ())
+        if missing:
+            self.report.error(1, {'header': f"Missing columns: {', '.join(sorted(missing))}"})
+            return self.report
+
+        numbered = ((reader.line_num, row) for row in reader)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            self._import_batch(batch)
+        self.report.errors.sort(key=lambda error: error['line'])
+        return self.report
+
+    def _import_batch(self, batch):
+        self.report.rows += len(batch)
+        candidates = []
+        for line, row in batch:
+            values, project_ids, errors = _clean(row)
+            if not errors:
+                if values['username'] in self._seen_usernames:
+                    errors['username'] = 'Duplicate username in file.'
+                if values['email'] in self._seen_emails:
+                    errors['email'] = 'Duplicate email in file.'
+            self._seen_usernames.add(values['username'])
+            self._seen_emails.add(values['email'])
+            if errors:
+                self.report.error(line, errors)
+            else:
+                candidates.append((line, values, project_ids | self.project_ids))
+
+        # Set-based uniqueness: one query per column for the whole batch
+        taken_usernames = set(User.objects.filter(
+            username__in=[values['username'] for _, values, _ in candidates]
+        ).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(
+            email__in=[values['email'] for _, values, _ in candidates]
+        ).values_list('email', flat=True))
+        live_projects = set(Project.objects.filter(
+            id__in=set().union(*(ids for _, _, ids in candidates))
+        ).values_list('id', flat=True))
+
+        valid = []
+        for line, values, project_ids in candidates:
+            errors = {}
+            if values['username'] in taken_usernames:
+                errors['username'] = 'A user with this username already exists.'
+            if values['email'] in taken_emails:
+                errors['email'] = 'A user with this email already exists.'
+            if project_ids - live_projects:
+                errors['projects'] = f"Unknown project ids: {', '.join(map(str, sorted(project_ids - live_projects)))}"
+            if errors:
+                self.report.error(line, errors)
+            else:
+                valid.append((line, values, project_ids))
+        if not valid:
+            return
+
+        hashes = self._hash([values['password'] or None for _, values, _ in valid])
+        users = []
+        for (line, values, _), password in zip(valid, hashes):
+            users.append(User(
+                username=values['username'],
+                email=values['email'],
+                first_name=values['first_name'],
+                last_name=values['last_name'],
+                phone=values['phone'] or None,
+                role=values['role'],
+                password=password,
+            ))
+        self._insert(valid, users)
+
+    def _hash(self, passwords):
+        if self._pool is None:
+            return [hash_password(password) for password in passwords]
+        chunksize = max(len(passwords) // (self.workers * 4), 1)
+        return list(self._pool.map(hash_password, passwords, chunksize=chunksize))
+
+    def _insert(self, valid, users):
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                created = list(zip(valid, users))
+                self._add_memberships(created)
+        except IntegrityError:
+            # Someone took a username/email since the check; isolate the rows
+            created = []
+            for (line, values, project_ids), user in zip(valid, users):
+                try:
+                    with transaction.atomic():
+                        user.pk = None
+                        user.save()
+                        self._add_memberships([((line, values, project_ids), user)])
+                    created.append(user)
+                except IntegrityError:
+                    self.report.error(line, {'username': 'A user with this username or email already exists.'})
+        self.report.created += len(created)
+
+    def _add_memberships(self, created):
+        Membership = Project.members.through
+        memberships = [
+            Membership(project_id=project_id, user_id=user.pk)
+            for (_, _, project_ids), user in created
+            for project_id in project_ids
+        ]
+        Membership.objects.bulk_create(memberships, ignore_conflicts=True)
+        self.report.memberships += len(memberships)
+        # Bulk inserts send no signals; invalidate what api.signals would
+        bump_on_commit('users', 'all')
+        for project_id in {project_id for (_, _, project_ids), _ in created for project_id in project_ids}:
+            bump_on_commit('project', project_id)
+
+
+def import_users(lines, project_ids=(), batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """Import a CSV (iterable of lines); returns an ImportReport"""
+    with UserImporter(project_ids, batch_size, workers) as importer:
+        return importer.run(lines)
@@ -0,0 +1,72 @@
+"""
+Indexed prefix search over users.
+
+Each whitespace-separated term must be a prefix of the username, email,
+first name or last name (case-insensitive). Prefixes are matched as ranges
+on the LOWER(...) expression indexes declared on User, e.g. 'ali' becomes
+'ali' <= LOWER(username) < 'alj', which both SQLite and PostgreSQL answer
+from the index; LIKE/ILIKE prefix patterns cannot use those indexes.
+
+Terms with non-ASCII characters use istartswith instead: SQLite's LOWER()
+only folds ASCII while str.lower() folds all of Unicode, so the ranges
+would miss matches. SQLite's LIKE folds only ASCII too, so those terms are
+also tried in lower, upper and capitalized form.
+"""
+import sys
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+LOWER_FIELDS = {field: Lower(field) for field in SEARCH_FIELDS}
+
+
+def _next_char(char):
+    code = ord(char) + 1
+    # Surrogates cannot be stored; the next storable code point follows them
+    return chr(0xE000 if 0xD800 <= code <= 0xDFFF else code)
+
+
+def prefix_bounds(term):
+    """
+    Half-open [low, high) range covering every string starting with `term`;
+    high is None when no string sorts after them all
+    """
+    low = term.lower()
+    # The highest code point cannot be incremented; carry into the one before it
+    stem = low.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return low, None
+    return low, stem[:-1] + _next_char(stem[-1])
+
+
+def search_terms(search):
+    return search.split()[:5]
+
+
+def annotate_lower(queryset):
+    """Expose the indexed LOWER(...) expressions as `<field>_lower` for filtering"""
+    return queryset.alias(**{f'{field}_lower': expression for field, expression in LOWER_FIELDS.items()})
+
+
+def prefix_search(queryset, search):
+    """Filter `queryset` to users matching every term of `search` as a prefix"""
+    terms = search_terms(search)
+    if not terms:
+        return queryset
+    queryset = annotate_lower(queryset)
+    for term in terms:
+        match = Q()
+        if term.isascii():
+            low, high = prefix_bounds(term)
+            for field in SEARCH_FIELDS:
+                in_range = Q(**{f'{field}_lower__gte': low})
+                if high is not None:
+                    in_range &= Q(**{f'{field}_lower__lt': high})
+                match |= in_range
+        else:
+            for field in SEARCH_FIELDS:
+                for variant in dict.fromkeys((term, term.lower(), term.upper(), term.capitalize())):
+                    match |= Q(**{f'{field}__istartswith': variant})
+        queryset = queryset.filter(match)
+    return queryset
@@ -0,0 +1,71 @@
+"""
+Cache data versions.
+
+A version is a counter in the cache that is bumped whenever the data behind
+a scope (e.g. one project's tasks) changes. Cached results embed the version
+in their key, so a bump makes every stale entry unreachable without having
+to find and delete it. Missing versions start from the current time in
+milliseconds, so an evicted counter never falls back to a number that
+older entries were stored under.
+
+Versions only invalidate across processes when the default cache is shared
+by all of them (Redis, see CACHES in settings); `is_shared()` tells. The
+features built on them fall back to uncached work on a per-process cache.
+"""
+import time
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+def is_shared():
+    """Whether the default cache is visible to every process"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _key(scope, ident):
+    return f'version:{scope}:{ident}'
+
+
+def get_version(scope, ident):
+    key = _key(scope, ident)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(scope, ident):
+    try:
+        cache.incr(_key(scope, ident))
+    except ValueError:
+        cache.set(_key(scope, ident), int(time.time() * 1000), None)
+
+
+def bump_on_commit(scope, ident):
+    """Bump once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: bump_version(scope, ident))
+
+
+def get_versioned(key, scope, ident):
+    """
+    (value, version) in one cache round trip: the value stored at `key` as
+    (version, value), or None unless it was stored under the current version
+    """
+    version_key = _key(scope, ident)
+    found = cache.get_many([version_key, key])
+    version = found[version_key] if version_key in found else get_version(scope, ident)
+    entry = found.get(key)
+    return (entry[1] if entry is not None and entry[0] == version else None), version
+
+
+def get_versions(scopes):
+    """{(scope, ident): version} for several scopes in one cache round trip"""
+    keys = {_key(scope, ident): (scope, ident) for scope, ident in scopes}
+    found = cache.get_many(list(keys))
+    return {
+        scope: found[key] if key in found else get_version(*scope)
+        for key, scope in keys.items()
+    }
@@ -0,0 +1,150 @@
+"""
+Cache-first session store with write-behind to the database.
+
+Selected with SESSION_MODE = 'cache'. Reads and writes go to the cache;
+changed sessions are also queued and upserted into django_session by a
+background flusher every SESSION_WRITE_BEHIND_INTERVAL seconds, so a cache
+miss (eviction, restart with a shared cache) falls back to the database as
+with Django's cached_db backend, without a database write on the request
+path. Queued writes are coalesced per session and drained on a clean
+shutdown.
+
+The flusher takes the queue under a lock and writes it after releasing
+it, so request threads never wait on the database. A session deleted
+(logout) while its write is in flight is remembered until the write has
+finished and is then deleted again; until then it loads as missing, so the
+write can never bring a logged-out session back.
+"""
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.models import Session
+from api.services.background import BackgroundWorker
+
+
+DEFAULT_INTERVAL = 5.0
+
+_pending = {}
+_flushing = set()  # session keys being written by flush_pending
+_deleted = set()  # those of them deleted meanwhile
+_lock = threading.Lock()
+
+
+class SessionStore(CachedDBStore):
+
+    def load(self):
+        data = self._cache.get(self.cache_key)
+        if data is not None:
+            return data
+        with _lock:
+            queued = _pending.get(self.session_key)
+            deleted = self.session_key in _deleted
+        if deleted:
+            self._session_key = None
+            return {}
+        if queued is not None:
+            return self.decode(queued.session_data)
+        return super().load()
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        age = self.get_expiry_age()
+        if must_create:
+            if not self._cache.add(self.cache_key, data, age):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, age)
+
+        with _lock:
+            _pending[self.session_key] = Session(
+                session_key=self.session_key,
+                session_data=self.encode(data),
+                expire_date=self.get_expiry_date()
+            )
+        _worker.start()
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with _lock:
+            _pending.pop(session_key, None)
+            if session_key in _flushing:
+                _deleted.add(session_key)
+        super().delete(session_key)
+
+    def flush(self):
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    # The inherited async variants would write through to the database
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def acreate(self):
+        return await sync_to_async(self.create)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    async def adelete(self, session_key=None):
+        return await sync_to_async(self.delete)(session_key)
+
+    async def aflush(self):
+        return await sync_to_async(self.flush)()
+
+
+def flush_pending():
+    """Upsert every queued session in one statement"""
+    with _lock:
+        if not _pending:
+            return False
+        batch = dict(_pending)
+        _pending.clear()
+        _flushing.update(batch)
+    try:
+        Session.objects.bulk_create(
+            batch.values(),
+            update_conflicts=True,
+            unique_fields=['session_key'],
+            update_fields=['session_data', 'expire_date']
+        )
+        with _lock:
+            deleted = _deleted.intersection(batch)
+        if deleted:
+            # Logged out while being written; later deletes find the row written
+            Session.objects.filter(session_key__in=deleted).delete()
+    except Exception:
+        # Keep them for the next pass unless a newer write replaced them
+        with _lock:
+            for key, session in batch.items():
+                if key not in _deleted:
+                    _pending.setdefault(key, session)
+        raise
+    finally:
+        with _lock:
+            _flushing.difference_update(batch)
+            _deleted.difference_update(batch)
+    return False
+
+
+_worker = BackgroundWorker(
+    'session-writer', flush_pending,
+    interval=getattr(settings, 'SESSION_WRITE_BEHIND_INTERVAL', DEFAULT_INTERVAL)
+)
@@ -0,0 +1,92 @@
+"""
+Cache invalidation: bump the data versions (api.services.versions) that
+cached responses (api.services.response_cache) depend on.
+
+  ('project', id)        the project, its members and its tasks
+  ('projects', 'all')    the set of projects (admins see all of them)
+  ('user-projects', id)  the projects a user is a member of
+  ('user-tasks', id)     the tasks assigned to a user
+  ('users', 'all')       any user's profile (embedded in most responses)
+  ('user-auth', id)      a user and their token, as cached by api.authentication
+
+Bumps happen on commit. Rows that were soft-deleted first are skipped when
+purged: their versions were bumped when they were hidden.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from api.models import Project, Task, User
+from api.services.versions import bump_on_commit
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    bump_on_commit('project', instance.pk)
+    if created:
+        bump_on_commit('projects', 'all')
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        bump_on_commit('project', instance.pk)
+        bump_on_commit('projects', 'all')
+
+
+def _task_changed(task):
+    bump_on_commit('project', task.project_id)
+    if task._loaded_project_id not in (None, task.project_id):
+        bump_on_commit('project', task._loaded_project_id)
+    if task.assigned_to_id:
+        bump_on_commit('user-tasks', task.assigned_to_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    _task_changed(instance)
+    instance._loaded_project_id = instance.project_id
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        _task_changed(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached response shows
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_on_commit('users', 'all')
+    bump_on_commit('user-auth', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_on_commit('users', 'all')
+    bump_on_commit('user-auth', instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    bump_on_commit('user-auth', instance.user_id)
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # pk_set is not provided for clear(); collect the affected side now
+        related = instance.projects if reverse else instance.members
+        instance._cleared_pks = set(related.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_pks', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    project_ids, user_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    for project_id in project_ids:
+        bump_on_commit('project', project_id)
+    for user_id in user_ids:
+        bump_on_commit('user-projects', user_id)
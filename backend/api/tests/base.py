@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Project, Task, User
+
+
+# Background writers (activity flusher, notification dispatcher) would write
+# from their own threads; tests run both inline. The cache is per process even
+# when REDIS_URL is set.
+TEST_SETTINGS = {
+    'ACTIVITY_LOG_MODE': 'sync',
+    'NOTIFICATION_DISPATCH': 'worker',
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class APITestCase(TestCase):
+    """Two members of one project with a task assigned to the second"""
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'password', first_name='Alice')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'password', first_name='Bob')
+        self.project = Project.objects.create(title='Launch', created_by=self.alice)
+        self.project.members.add(self.alice, self.bob)
+        self.task = Task.objects.create(
+            title='Write docs', project=self.project, created_by=self.alice, assigned_to=self.bob
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
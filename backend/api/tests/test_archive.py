@@ -0,0 +1,54 @@
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from django.test import override_settings
+from api.models import ActivityLog
+from api.services import retention
+from .base import APITestCase
+
+
+class ArchiveTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        archive_settings = override_settings(ACTIVITY_ARCHIVE_DIR=directory.name)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+        moment = datetime(2020, 3, 1, tzinfo=dt_timezone.utc)
+        self.entries = ActivityLog.objects.bulk_create([
+            ActivityLog(user=self.alice, task=self.task, project=self.project, action_type='updated',
+                        description=f'Edit {i}', created_at=moment + timedelta(minutes=i // 2))
+            for i in range(12)
+        ])
+        # A crash between writing a batch and deleting its rows appends it again
+        with mock.patch.object(retention, 'delete_batch', return_value=0):
+            retention.archive_activity_batch(batch_size=5)
+        while retention.archive_activity_batch(batch_size=5):
+            pass
+
+    def test_duplicates_are_skipped(self):
+        ids = [record['id'] for record in retention.read_archive('2020-03')]
+        self.assertEqual(ids, [entry.id for entry in self.entries])
+
+    def test_pages_newest_first(self):
+        client = self.client_for(self.alice)
+        newest_first = [entry.id for entry in reversed(self.entries)]
+
+        with mock.patch.object(retention, 'read_archive', wraps=retention.read_archive) as read:
+            response = client.get('/api/activities/archive/', {'month': '2020-03'})
+            self.assertEqual(response.data['count'], 12)
+            self.assertEqual([record['id'] for record in response.data['results']], newest_first[:10])
+            self.assertEqual(read.call_count, 1)
+
+            response = client.get('/api/activities/archive/', {'month': '2020-03', 'page': 2})
+            self.assertEqual([record['id'] for record in response.data['results']], newest_first[10:])
+            self.assertEqual(read.call_count, 2)
+
+    def test_pages_past_the_kept_records(self):
+        records = retention.NewestFirstArchive('2020-03', keep=3)
+        self.assertEqual(len(records), 12)
+        self.assertEqual([record['id'] for record in records[5:8]],
+                         [entry.id for entry in reversed(self.entries)][5:8])
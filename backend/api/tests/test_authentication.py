@@ -0,0 +1,35 @@
+from unittest import mock
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from api.authentication import CachedTokenAuthentication, token_cache
+from .base import APITestCase
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.token = Token.objects.create(user=self.bob)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        return self.authentication.authenticate_credentials(self.token.key)[0]
+
+    def test_repeat_calls_are_served_from_the_cache(self):
+        self.assertEqual(self.authenticate(), self.bob)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(), self.bob)
+
+    def test_revocation_in_another_process_applies_on_the_next_hit(self):
+        with mock.patch('api.authentication.is_shared', return_value=True):
+            self.authenticate()
+            # Deleted elsewhere: this process's entry is still there...
+            with self.captureOnCommitCallbacks(execute=True):
+                Token.objects.filter(pk=self.token.pk).delete()
+            self.assertEqual(len(token_cache), 1)
+
+            # ...but the bumped auth version makes it a miss
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from django.utils import timezone
+from api.models import Project, Task, TaskTransition
+from api.services.burndown import daily_status_counts
+from .base import APITestCase
+
+
+class BurndownTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=2)
+        TaskTransition.objects.filter(task=self.task).delete()
+        self.transition('', 'todo', days_ago=2)
+
+    def transition(self, from_status, to_status, days_ago, project=None):
+        TaskTransition.objects.create(
+            task=self.task, project=project or self.project, from_status=from_status, to_status=to_status,
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def todo(self, project):
+        return daily_status_counts(project.id, self.start, self.today)['todo']
+
+    def test_status_changes(self):
+        self.transition('todo', 'completed', days_ago=1)
+        series = daily_status_counts(self.project.id, self.start, self.today)
+        self.assertEqual(series['todo'], [1, 0, 0])
+        self.assertEqual(series['completed'], [0, 1, 1])
+
+    def test_moved_task_counts_in_its_project_at_the_time(self):
+        other = Project.objects.create(title='Other', created_by=self.alice)
+        other.members.add(self.alice)
+        self.transition('todo', 'todo', days_ago=1, project=other)
+
+        self.assertEqual(self.todo(self.project), [1, 0, 0])
+        self.assertEqual(self.todo(other), [0, 1, 1])
+
+    def test_move_through_the_api_is_recorded(self):
+        other = Project.objects.create(title='Other', created_by=self.alice)
+        other.members.add(self.alice)
+
+        response = self.client_for(self.alice).patch(f'/api/tasks/{self.task.id}/', {'project': other.id}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        move = TaskTransition.objects.filter(task=self.task).last()
+        self.assertEqual((move.project_id, move.from_status, move.to_status), (other.id, 'todo', 'todo'))
+        self.assertEqual(self.todo(self.project)[-1], 0)
+        self.assertEqual(self.todo(other)[-1], 1)
+
+    def test_deleted_task_keeps_its_history(self):
+        Task.all_objects.filter(pk=self.task.pk).update(deleted_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(self.todo(self.project), [1, 0, 0])
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from django.test import override_settings
+from django.utils import timezone
+from api.models import Comment, Notification
+from api.services import outbox
+from api.services.coalescing import send_digests
+from .base import APITestCase
+
+
+class CommentNotificationTestCase(APITestCase):
+
+    def comment(self):
+        """Alice comments on Bob's task and the outbox is dispatched"""
+        comment = Comment.objects.create(task=self.task, user=self.alice, content='Update')
+        outbox.enqueue('comment_created', self.alice, comment=comment.id)
+        outbox.dispatch_batch()
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOWS={'comment': 900})
+class CoalescingTests(CommentNotificationTestCase):
+
+    def test_comments_in_window_are_merged(self):
+        self.comment()
+        self.comment()
+
+        notification = Notification.objects.get(recipient=self.bob)
+        self.assertEqual(notification.occurrences, 2)
+
+    def test_window_is_anchored_to_first_occurrence(self):
+        self.comment()
+        # The first occurrence is almost out of the 15 minute window...
+        Notification.objects.update(first_occurred_at=timezone.now() - timedelta(minutes=14))
+        self.comment()
+        self.assertEqual(Notification.objects.get(recipient=self.bob).occurrences, 2)
+
+        # ...and merging did not move it, so once it is past a new row starts
+        Notification.objects.update(first_occurred_at=timezone.now() - timedelta(minutes=16))
+        self.comment()
+        self.assertEqual(
+            sorted(Notification.objects.filter(recipient=self.bob).values_list('occurrences', flat=True)),
+            [1, 2]
+        )
+
+
+class DigestTests(CommentNotificationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bob.notification_digest = 'hourly'
+        self.bob.save()
+
+    def visible(self):
+        return list(Notification.objects.visible_to(self.bob.id).values_list('notification_type', flat=True))
+
+    def test_pending_notifications_fold_into_one_digest(self):
+        self.comment()
+        self.assertTrue(Notification.objects.filter(recipient=self.bob, digest_pending=True).exists())
+        self.assertEqual(self.visible(), [])
+
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(self.visible(), ['digest'])
+        self.assertFalse(Notification.objects.filter(recipient=self.bob, digest_pending=True).exists())
+
+        # Not due again within the period
+        self.comment()
+        self.assertEqual(send_digests(), 0)
+        self.assertEqual(send_digests(timezone.now() + timedelta(hours=2)), 1)
+
+    def test_opting_out_releases_pending_rows(self):
+        self.comment()
+        client = self.client_for(self.bob)
+
+        response = client.patch('/api/users/profile/', {'notification_digest': 'off'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.visible(), ['digest'])
+        self.assertFalse(Notification.objects.filter(recipient=self.bob, digest_pending=True).exists())
+
+    def test_rows_held_after_opt_out_are_still_sent(self):
+        self.comment()
+        send_digests()
+        # Held under the old preference, e.g. dispatched while it changed
+        self.comment()
+        self.bob.notification_digest = 'off'
+        self.bob.save()
+
+        self.assertEqual(send_digests(), 1)
+        self.assertFalse(Notification.objects.filter(recipient=self.bob, digest_pending=True).exists())
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest import mock
+from django.utils import timezone
+from api.models import Comment, Notification, NotificationEvent
+from api.services import outbox
+from .base import APITestCase
+
+
+class OutboxTests(APITestCase):
+
+    def enqueue_comment(self, content='Looks good'):
+        comment = Comment.objects.create(task=self.task, user=self.alice, content=content)
+        return outbox.enqueue('comment_created', self.alice, comment=comment.id)
+
+    def expire_lease(self):
+        NotificationEvent.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+
+    def test_dispatch_creates_notifications_and_deletes_events(self):
+        self.enqueue_comment()
+
+        self.assertEqual(outbox.dispatch_batch(), 1)
+        self.assertEqual(NotificationEvent.objects.count(), 0)
+        notification = Notification.objects.get(recipient=self.bob)
+        self.assertEqual(notification.notification_type, 'comment')
+        self.assertFalse(Notification.objects.filter(recipient=self.alice).exists())
+
+    def test_claimed_events_are_leased(self):
+        self.enqueue_comment()
+
+        self.assertEqual(len(outbox._claim(10)), 1)
+        # A second dispatcher sees nothing until the lease runs out
+        self.assertEqual(outbox._claim(10), [])
+        self.expire_lease()
+        self.assertEqual(len(outbox._claim(10)), 1)
+
+    def test_expansion_failure_is_retried_then_given_up(self):
+        event = self.enqueue_comment()
+        failing = {**outbox.EXPANDERS, 'comment_created': mock.Mock(side_effect=RuntimeError('boom'))}
+
+        with mock.patch.dict(outbox.EXPANDERS, failing), self.assertLogs('api.services.outbox', 'ERROR'):
+            outbox.dispatch_batch()
+            event.refresh_from_db()
+            self.assertEqual(event.attempts, 1)
+            self.assertIn('boom', event.last_error)
+            self.assertEqual(event.status, 'pending')
+            self.assertEqual(event.claim_token, '')
+            self.assertGreater(event.available_at, timezone.now())
+
+            for _ in range(outbox.MAX_ATTEMPTS - 1):
+                self.expire_lease()
+                outbox.dispatch_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, outbox.MAX_ATTEMPTS)
+        self.assertEqual(event.status, 'failed')
+
+        self.expire_lease()
+        self.assertEqual(outbox.dispatch_batch(), 0)
+
+    def test_poison_event_does_not_block_its_batch(self):
+        poison = self.enqueue_comment('first')
+        healthy = self.enqueue_comment('second')
+        write = outbox._write
+
+        def failing_write(notifications, event_ids):
+            if poison.id in event_ids:
+                raise RuntimeError('constraint failed')
+            return write(notifications, event_ids)
+
+        with mock.patch.object(outbox, '_write', failing_write), self.assertLogs('api.services.outbox', 'ERROR'):
+            self.assertEqual(outbox.dispatch_batch(), 2)
+
+        self.assertFalse(NotificationEvent.objects.filter(pk=healthy.pk).exists())
+        self.assertEqual(Notification.objects.filter(recipient=self.bob).count(), 1)
+        poison.refresh_from_db()
+        self.assertEqual(poison.attempts, 1)
+        self.assertIn('constraint failed', poison.last_error)
+        self.assertEqual(poison.claim_token, '')
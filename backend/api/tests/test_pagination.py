@@ -0,0 +1,120 @@
+import sys
+from django.utils import timezone
+from api.models import ActivityLog, Comment, User
+from api.services.user_search import prefix_bounds, prefix_search
+from .base import APITestCase
+
+
+class CursorPaginationTests(APITestCase):
+
+    def walk(self, client, url):
+        """Follow `next` links; returns (ids in order, last response)"""
+        ids = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        return ids, response
+
+    def walk_back(self, client, response):
+        ids = []
+        url = response.data['previous']
+        while url:
+            response = client.get(url)
+            ids = [row['id'] for row in response.data['results']] + ids
+            url = response.data['previous']
+        return ids
+
+    def test_replies_pages_oldest_first(self):
+        parent = Comment.objects.create(task=self.task, user=self.alice, content='Thread')
+        replies = [
+            Comment.objects.create(task=self.task, user=self.bob, content=f'Reply {i}', parent=parent).id
+            for i in range(7)
+        ]
+
+        ids, _ = self.walk(self.client_for(self.alice), f'/api/comments/{parent.id}/replies/?page_size=3')
+        self.assertEqual(ids, replies)
+
+    def test_activity_feed_with_equal_timestamps(self):
+        moment = timezone.now()
+        entries = ActivityLog.objects.bulk_create([
+            ActivityLog(user=self.alice, task=self.task, project=self.project, action_type='updated',
+                        description=f'Edit {i}', created_at=moment)
+            for i in range(9)
+        ])
+        client = self.client_for(self.alice)
+
+        ids, last = self.walk(client, '/api/activities/?page_size=4')
+        self.assertEqual(ids, sorted((entry.id for entry in entries), reverse=True))
+
+        # Entries arriving while paging show up on the first page, not mid-feed
+        first = client.get('/api/activities/?page_size=4')
+        ActivityLog.objects.create(user=self.alice, project=self.project, action_type='created', description='New')
+        rest, _ = self.walk(client, first.data['next'])
+        self.assertEqual([row['id'] for row in first.data['results']] + rest, ids)
+
+    def test_user_directory_pages_over_ties(self):
+        admin = User.objects.create_user('root', 'root@example.com', 'password', role='admin')
+        for i in range(12):
+            User.objects.create_user(f'user{i:02}', f'user{i}@example.com', 'password', first_name=['Ann', 'Bo'][i % 2])
+        client = self.client_for(admin)
+        everyone = set(User.objects.values_list('id', flat=True))
+
+        for ordering in ('-project_count', 'first_name', 'task_count,-first_name', '-date_joined'):
+            with self.subTest(ordering=ordering):
+                ids, last = self.walk(client, f'/api/users/?ordering={ordering}&page_size=3')
+                self.assertEqual(len(ids), len(everyone))
+                self.assertEqual(set(ids), everyone)
+                back = self.walk_back(client, last)
+                self.assertEqual(back, ids[:len(back)])
+
+    def test_user_directory_stable_when_tied_values_change(self):
+        admin = User.objects.create_user('root', 'root@example.com', 'password', role='admin')
+        for i in range(8):
+            User.objects.create_user(f'user{i:02}', f'user{i}@example.com', 'password', first_name='Ann')
+        client = self.client_for(admin)
+
+        first = client.get('/api/users/?ordering=first_name&page_size=4')
+        seen = [row['id'] for row in first.data['results']]
+        # A row ahead of the cursor moves into the run the first page ended in
+        User.objects.filter(username='user07').update(first_name='Alice')
+        rest, _ = self.walk(client, first.data['next'])
+
+        self.assertFalse(set(seen) & set(rest))
+
+    def test_ordering_only_applies_to_the_directory(self):
+        client = self.client_for(self.bob)
+        for url in (f'/api/users/{self.bob.id}/', '/api/users/profile/'):
+            with self.subTest(url=url):
+                response = client.get(url, {'ordering': 'project_count'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_invalid_cursor_is_not_found(self):
+        admin = User.objects.create_user('root', 'root@example.com', 'password', role='admin')
+        response = self.client_for(admin).get('/api/users/?cursor=cD1nYXJiYWdl')
+        self.assertEqual(response.status_code, 404)
+
+
+class PrefixSearchTests(APITestCase):
+
+    def test_prefix_bounds(self):
+        self.assertEqual(prefix_bounds('Ali'), ('ali', 'alj'))
+        top = chr(sys.maxunicode)
+        self.assertEqual(prefix_bounds('a' + top), ('a' + top, 'b'))
+        self.assertEqual(prefix_bounds(top), (top, None))
+        self.assertEqual(prefix_bounds('퟿'), ('퟿', ''))
+
+    def test_prefix_search(self):
+        User.objects.create_user('zoe', 'zoe@example.com', 'password', first_name='Émile', last_name='Øst')
+
+        def search(term):
+            return sorted(prefix_search(User.objects.all(), term).values_list('username', flat=True))
+
+        self.assertEqual(search('AL'), ['alice'])
+        self.assertEqual(search('bob@'), ['bob'])
+        self.assertEqual(search('alice bo'), [])
+        self.assertEqual(search('émile'), ['zoe'])
+        self.assertEqual(search('ÉMILE'), ['zoe'])
+        self.assertEqual(search('øst'), ['zoe'])
+        self.assertEqual(search(chr(sys.maxunicode)), [])
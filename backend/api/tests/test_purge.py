@@ -0,0 +1,59 @@
+from api.models import ActivityLog, Comment, Notification, Project, Task, TaskTransition
+from api.services import purge
+from .base import APITestCase
+
+
+class PurgeTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        comment = Comment.objects.create(task=self.task, user=self.alice, content='First')
+        Comment.objects.create(task=self.task, user=self.bob, content='Reply', parent=comment)
+        Notification.objects.create(
+            recipient=self.bob, sender=self.alice, notification_type='comment', task=self.task, message='New comment'
+        )
+        ActivityLog.objects.create(user=self.alice, task=self.task, action_type='commented', description='Commented')
+        self.other = Project.objects.create(title='Other', created_by=self.alice)
+        self.other_task = Task.objects.create(title='Keep me', project=self.other, created_by=self.alice)
+
+    def test_soft_delete_hides_project_and_tasks(self):
+        self.project.soft_delete()
+
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertTrue(Task.all_objects.filter(pk=self.task.pk).exists())
+        response = self.client_for(self.alice).get('/api/projects/')
+        self.assertNotIn(self.project.pk, [project['id'] for project in response.data['results']])
+
+    def test_purge_removes_leaves_before_parents(self):
+        self.project.soft_delete()
+        labels = []
+        while (result := purge.purge_batch(batch_size=1)) is not None:
+            labels.append(result[0])
+
+        order = [label for label, _ in purge._purge_steps()]
+        # Batches run step by step: once a step is done it never comes back
+        self.assertEqual(labels, sorted(labels, key=order.index))
+        for leaf, parent in [
+            ('notifications', 'tasks'), ('task transitions', 'tasks'),
+            ('comment replies', 'comments'), ('comments', 'tasks'), ('tasks', 'projects'),
+        ]:
+            if leaf in labels:
+                self.assertLess(labels.index(leaf), labels.index(parent))
+        self.assertIn('projects', labels)
+
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
+        self.assertFalse(Task.all_objects.filter(pk=self.task.pk).exists())
+        self.assertFalse(Comment.objects.filter(task_id=self.task.pk).exists())
+        self.assertFalse(Notification.objects.filter(task_id=self.task.pk).exists())
+        self.assertFalse(TaskTransition.objects.filter(task_id=self.task.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=self.other_task.pk).exists())
+        self.assertEqual(sum(purge.pending_counts().values()), 0)
+
+    def test_purge_deleted_task_only(self):
+        self.task.soft_delete()
+        totals = purge.purge_deleted()
+
+        self.assertEqual(totals['tasks'], 1)
+        self.assertNotIn('projects', totals)
+        self.assertTrue(Project.objects.filter(pk=self.project.pk).exists())
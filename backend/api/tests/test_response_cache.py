@@ -0,0 +1,121 @@
+from unittest import mock
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase
+from api.db_routers import ReplicaRouter, _state, begin_request, primary_reads
+from api.models import Project, Task
+from .base import APITestCase
+
+
+class ResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The per-process test cache stands in for Redis: there is one process
+        shared = mock.patch('api.services.response_cache.is_shared', return_value=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    def get(self, user, url):
+        response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def project_titles(self, user):
+        response = self.get(user, '/api/projects/')
+        return response['X-Cache'], sorted(project['title'] for project in response.data['results'])
+
+    def my_task_titles(self, user):
+        response = self.get(user, '/api/tasks/my_tasks/')
+        return response['X-Cache'], sorted(task['title'] for task in response.data)
+
+    def test_repeat_reads_are_hits(self):
+        self.assertEqual(self.project_titles(self.bob), ('miss', ['Launch']))
+        self.assertEqual(self.project_titles(self.bob), ('hit', ['Launch']))
+        # Scoped per user
+        self.assertEqual(self.project_titles(self.alice)[0], 'miss')
+
+    def test_project_change_invalidates(self):
+        self.project_titles(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = 'Launch v2'
+            self.project.save()
+        self.assertEqual(self.project_titles(self.bob), ('miss', ['Launch v2']))
+
+    def test_membership_change_invalidates(self):
+        other = Project.objects.create(title='Other', created_by=self.alice)
+        self.project_titles(self.bob)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.members.add(self.bob)
+        self.assertEqual(self.project_titles(self.bob), ('miss', ['Launch', 'Other']))
+
+        self.project_titles(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bob.projects.clear()
+        self.assertEqual(self.project_titles(self.bob), ('miss', []))
+
+    def test_task_reassignment_invalidates_both_assignees(self):
+        self.assertEqual(self.my_task_titles(self.bob), ('miss', ['Write docs']))
+        self.assertEqual(self.my_task_titles(self.alice), ('miss', []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.assigned_to = self.alice
+            self.task.save()
+        self.assertEqual(self.my_task_titles(self.bob), ('miss', []))
+        self.assertEqual(self.my_task_titles(self.alice), ('miss', ['Write docs']))
+
+    def test_task_created_through_api_invalidates(self):
+        self.my_task_titles(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_for(self.alice).post('/api/tasks/', {
+                'title': 'Review', 'project': self.project.id, 'assigned_to': self.bob.id,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.my_task_titles(self.bob), ('miss', ['Review', 'Write docs']))
+
+    def test_soft_deleted_task_invalidates(self):
+        self.my_task_titles(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(pk=self.task.pk).soft_delete()
+        self.assertEqual(self.my_task_titles(self.bob), ('miss', []))
+
+    def test_user_profile_change_invalidates(self):
+        self.get(self.bob, '/api/tasks/my_tasks/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.first_name = 'Alicia'
+            self.alice.save()
+        response = self.get(self.bob, '/api/tasks/my_tasks/')
+        self.assertEqual(response['X-Cache'], 'miss')
+
+    def test_login_does_not_invalidate(self):
+        self.get(self.bob, '/api/tasks/my_tasks/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.save(update_fields=['last_login'])
+        self.assertEqual(self.my_task_titles(self.bob)[0], 'hit')
+
+
+class PerProcessCacheTests(APITestCase):
+
+    def test_responses_are_not_cached(self):
+        client = self.client_for(self.bob)
+        for _ in range(2):
+            response = client.get('/api/projects/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('X-Cache', response)
+
+
+class PrimaryReadsTests(SimpleTestCase):
+
+    def test_primary_reads_overrides_replica_routing(self):
+        token = begin_request()
+        try:
+            _state.get().read_alias = 'replica'
+            router = ReplicaRouter()
+            with primary_reads():
+                self.assertIsNone(router.db_for_read(Task))
+            self.assertEqual(router.db_for_read(Task), 'replica')
+            # Writes always go to the primary and pin later reads there
+            self.assertEqual(router.db_for_write(Task), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_read(Task), DEFAULT_DB_ALIAS)
+        finally:
+            _state.reset(token)
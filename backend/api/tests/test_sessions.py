@@ -0,0 +1,51 @@
+from unittest import mock
+from django.contrib.sessions.models import Session
+from api import sessions
+from .base import APITestCase
+
+
+class WriteBehindSessionTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        worker = mock.patch.object(sessions._worker, 'start')
+        worker.start()
+        self.addCleanup(worker.stop)
+
+    def store(self, **data):
+        store = sessions.SessionStore()
+        store.update(data)
+        store.save()
+        return store
+
+    def test_queued_session_is_written_on_flush(self):
+        store = self.store(user='bob')
+        self.assertFalse(Session.objects.filter(session_key=store.session_key).exists())
+
+        sessions.flush_pending()
+
+        self.assertTrue(Session.objects.filter(session_key=store.session_key).exists())
+        self.assertEqual(sessions.SessionStore(store.session_key).load(), {'user': 'bob'})
+
+    def test_delete_during_flush_is_not_undone(self):
+        store = self.store(user='bob')
+        key = store.session_key
+        bulk_create = Session.objects.bulk_create
+        loaded = []
+
+        def write(*args, **kwargs):
+            # Request threads are not blocked while the batch is written...
+            self.assertTrue(sessions._lock.acquire(blocking=False))
+            sessions._lock.release()
+            # ...and a logout lands before it commits
+            sessions.SessionStore(key).delete()
+            result = bulk_create(*args, **kwargs)
+            loaded.append(sessions.SessionStore(key).load())
+            return result
+
+        with mock.patch.object(Session.objects, 'bulk_create', write):
+            sessions.flush_pending()
+
+        self.assertEqual(loaded, [{}])
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertEqual(sessions.SessionStore(key).load(), {})
@@ -0,0 +1,37 @@
+import io
+import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+from api.models import User
+from api.services import thumbnails
+from .base import APITestCase
+
+
+class BackfillTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def picture(self, user, content):
+        name = default_storage.save(f'profile_pictures/{user.username}.png', ContentFile(content))
+        User.objects.filter(pk=user.pk).update(profile_picture=name)
+
+    def test_unreadable_picture_does_not_stop_the_run(self):
+        image = io.BytesIO()
+        Image.new('RGB', (300, 200), 'red').save(image, 'PNG')
+        self.picture(self.alice, b'not an image')
+        self.picture(self.bob, image.getvalue())
+
+        with self.assertLogs('api.services.thumbnails', 'ERROR'):
+            processed, failed = thumbnails.backfill()
+
+        self.assertEqual((processed, failed), (1, [self.alice.pk]))
+        self.assertTrue(User.objects.get(pk=self.bob.pk).profile_thumbnail)
+        self.assertFalse(User.objects.get(pk=self.alice.pk).profile_thumbnail)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import override_settings
+from django.utils import timezone
+from api.models import Notification
+from api.services import retention, unread
+from .base import APITestCase
+
+
+class UnreadCountTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The per-process test cache stands in for Redis: there is one process
+        shared = mock.patch('api.services.unread.is_shared', return_value=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    def notify(self, **fields):
+        fields = {'recipient': self.bob, 'notification_type': 'comment', 'message': 'Hello', **fields}
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(**fields)
+
+    def test_count_follows_changes(self):
+        self.assertEqual(unread.get_unread_count(self.bob.id), 0)
+        first = self.notify()
+        self.notify(task=self.task)
+        self.assertEqual(unread.get_unread_count(self.bob.id), 2)
+
+        client = self.client_for(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/notifications/{first.id}/mark_read/')
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+        self.assertEqual(client.get('/api/notifications/unread_count/').data['count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post('/api/notifications/mark_all_read/')
+        self.assertEqual(unread.get_unread_count(self.bob.id), 0)
+
+    def test_cached_count_is_served_without_queries(self):
+        self.notify()
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+
+    def test_per_process_cache_counts_every_time(self):
+        self.notify()
+        with mock.patch('api.services.unread.is_shared', return_value=False):
+            unread.get_unread_count(self.bob.id)
+            # Another process's change would not bump this process's version
+            Notification.objects.create(recipient=self.bob, notification_type='comment', message='Hi')
+            with self.assertNumQueries(1):
+                self.assertEqual(unread.get_unread_count(self.bob.id), 2)
+
+    def test_bulk_create_counts(self):
+        unread.get_unread_count(self.bob.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.bulk_create([
+                Notification(recipient=self.bob, notification_type='comment', message='One'),
+                Notification(recipient=self.bob, notification_type='comment', message='Two', is_read=True),
+                Notification(recipient=self.bob, notification_type='comment', message='Held', digest_pending=True),
+            ])
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+
+    def test_count_racing_a_new_notification_is_not_served(self):
+        count_unread = unread.count_unread
+
+        def count_then_notify(user_id):
+            # A notification commits after the COUNT ran but before it is cached
+            count = count_unread(user_id)
+            self.notify()
+            return count
+
+        with mock.patch.object(unread, 'count_unread', count_then_notify):
+            self.assertEqual(unread.get_unread_count(self.bob.id), 0)
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+
+    def test_hidden_task_drops_out_of_count(self):
+        self.notify(task=self.task)
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.soft_delete()
+        self.assertEqual(unread.get_unread_count(self.bob.id), 0)
+
+    def test_retention_recounts_recipients(self):
+        notification = self.notify()
+        self.assertEqual(unread.get_unread_count(self.bob.id), 1)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+        with override_settings(RETENTION={'unread_notifications_days': 30}), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(retention.enforce()['unread notifications'], 1)
+        self.assertEqual(unread.get_unread_count(self.bob.id), 0)
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from api.views import CommentViewSet, NotificationViewSet, ActivityLogViewSet
+from api.views.stream_views import notification_bell, notification_stream
 
 router = DefaultRouter()
 router.register(r'comments', CommentViewSet, basename='comment')
@@ -8,5 +9,8 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'activities', ActivityLogViewSet, basename='activity')
 
 urlpatterns = [
+    # Must precede the router so these aren't taken for a notification pk
+    path('notifications/stream/', notification_stream, name='notification-stream'),
+    path('notifications/bell/', notification_bell, name='notification-bell'),
     path('', include(router.urls)),
 ]
@@ -1,7 +1,8 @@
 from django.urls import path
-from ..views.report_views import admin_reports, user_reports
+from ..views.report_views import admin_reports, user_reports, flow_reports
 
 urlpatterns = [
     path('admin/', admin_reports, name='admin-reports'),
     path('user/', user_reports, name='user-reports'),
+    path('flow/', flow_reports, name='flow-reports'),
 ]
@@ -1,14 +1,24 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
-import re
-from api.models import Comment, Notification, ActivityLog, Task
+from django.db import transaction
+from django.db.models import Q, Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from api.db_routers import ReplicaReadsMixin
+from api.models import Comment, Notification, ActivityLog, ActivityDailyCount, Project, Task
+from api.pagination import ActivityCursorPagination, ReplyCursorPagination
+from api.realtime import publish_unread_changed
 from api.serializers import CommentSerializer, NotificationSerializer, ActivityLogSerializer
+from api.serializers.comment_serializers import INLINE_REPLY_LIMIT
+from api.services import heatmap, outbox, retention
+from api.services.activity import log_activity
+from api.services.mentions import mentioned_usernames, render_content, resolve_mentions
+from api.services.unread import get_unread_count, invalidate_unread_counts
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
 
@@ -24,6 +34,9 @@ class CommentViewSet(viewsets.ModelViewSet):
                 Q(task__project__members=user) | Q(task__project__created_by=user)
             )
         
+        # Hide comments on soft-deleted tasks until they are purged
+        queryset = queryset.filter(task__deleted_at__isnull=True)
+        
         # Filter by task if provided (only for list action)
         if self.action == 'list':
             task_id = self.request.query_params.get('task', None)
@@ -31,15 +44,42 @@ class CommentViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(task_id=task_id)
             # Only return top-level comments for list action (replies are nested in serializer)
             queryset = queryset.filter(parent__isnull=True)
+            
+            # Count replies in the same query and embed only the first few of each thread
+            reply_counts = (
+                Comment.objects.filter(parent=OuterRef('pk'))
+                .order_by()
+                .values('parent')
+                .annotate(total=Count('pk'))
+                .values('total')
+            )
+            queryset = queryset.annotate(
+                replies_total=Coalesce(Subquery(reply_counts), 0)
+            ).prefetch_related(Prefetch(
+                'replies',
+                queryset=Comment.objects.select_related('user').order_by('created_at', 'id')[:INLINE_REPLY_LIMIT],
+                to_attr='inline_replies',
+            ))
         
         # Ensure we return distinct results to avoid duplicates from joins
-        return queryset.select_related('user', 'task').prefetch_related('replies__user').distinct()
+        return queryset.select_related('user', 'task').distinct()
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        comment = serializer.save(user=self.request.user)
+        # Resolved mentions drive the rendered HTML and, via mentioned_user_ids, notifications
+        task = serializer.validated_data['task']
+        content = serializer.validated_data['content']
+        mentioned_users = list(resolve_mentions(mentioned_usernames(content), task.project))
+        content_html, mentioned_user_ids = render_content(content, mentioned_users)
+        
+        comment = serializer.save(
+            user=self.request.user,
+            content_html=content_html,
+            mentioned_user_ids=mentioned_user_ids
+        )
         
-        # Create activity log
-        ActivityLog.objects.create(
+        # Log the activity (written in bulk after commit)
+        log_activity(
             user=self.request.user,
             action_type='commented',
             task=comment.task,
@@ -47,22 +87,31 @@ class CommentViewSet(viewsets.ModelViewSet):
             description=f"commented on task: {comment.task.title}"
         )
         
-        # Check for mentions (@username) in comment content
-        self._process_mentions(comment)
-        
-        # Notify task assignee if not the commenter
-        if comment.task.assigned_to and comment.task.assigned_to != self.request.user:
-            Notification.objects.create(
-                recipient=comment.task.assigned_to,
-                sender=self.request.user,
-                notification_type='comment',
-                task=comment.task,
-                comment=comment,
-                message=f"{self.request.user.get_full_name()} commented on task: {comment.task.title}"
-            )
+        # Mention and assignee notifications are expanded by the outbox dispatcher
+        outbox.enqueue('comment_created', self.request.user, comment=comment.id)
 
     def perform_update(self, serializer):
-        serializer.save(is_edited=True)
+        comment = serializer.instance
+        content = serializer.validated_data.get('content', comment.content)
+        mentioned_users = resolve_mentions(mentioned_usernames(content), comment.task.project)
+        content_html, mentioned_user_ids = render_content(content, mentioned_users)
+        
+        serializer.save(
+            is_edited=True,
+            content_html=content_html,
+            mentioned_user_ids=mentioned_user_ids
+        )
+
+    @action(detail=True, methods=['get'])
+    def replies(self, request, pk=None):
+        """Cursor-paginated replies of a comment, oldest first"""
+        comment = self.get_object()
+        replies = Comment.objects.filter(parent=comment).select_related('user')
+        
+        paginator = ReplyCursorPagination()
+        page = paginator.paginate_queryset(replies, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     def perform_destroy(self, instance):
         """Override destroy to add permission check and logging"""
@@ -72,7 +121,7 @@ class CommentViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You can only delete your own comments.")
         
         # Log the deletion
-        ActivityLog.objects.create(
+        log_activity(
             user=self.request.user,
             action_type='deleted',
             task=instance.task,
@@ -83,36 +132,13 @@ class CommentViewSet(viewsets.ModelViewSet):
         # Delete the comment (CASCADE will handle replies)
         instance.delete()
 
-    def _process_mentions(self, comment):
-        """Process @mentions in comment content and create notifications"""
-        mention_pattern = r'@(\w+)'
-        mentioned_usernames = re.findall(mention_pattern, comment.content)
-        
-        if mentioned_usernames:
-            from api.models import User
-            for username in mentioned_usernames:
-                try:
-                    mentioned_user = User.objects.get(username=username)
-                    if mentioned_user != self.request.user:
-                        Notification.objects.create(
-                            recipient=mentioned_user,
-                            sender=self.request.user,
-                            notification_type='mention',
-                            task=comment.task,
-                            comment=comment,
-                            message=f"{self.request.user.get_full_name()} mentioned you in a comment"
-                        )
-                except User.DoesNotExist:
-                    continue
-
-
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Notification.objects.filter(recipient=user)
+        queryset = Notification.objects.visible_to(user.id)
         
         # Filter by read status
         is_read = self.request.query_params.get('is_read', None)
@@ -121,13 +147,24 @@ class NotificationViewSet(viewsets.ModelViewSet):
         
         return queryset.select_related('sender', 'task', 'comment')
 
+    def perform_destroy(self, instance):
+        was_unread = not instance.is_read
+        instance.delete()
+        if was_unread:
+            invalidate_unread_counts([instance.recipient_id])
+            publish_unread_changed(instance.recipient_id)
+
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read for the current user"""
         updated = Notification.objects.filter(
             recipient=request.user,
-            is_read=False
+            is_read=False,
+            digest_pending=False
         ).update(is_read=True)
+        if updated:
+            invalidate_unread_counts([request.user.id])
+            publish_unread_changed(request.user.id)
         
         return Response({
             'message': f'{updated} notifications marked as read'
@@ -137,8 +174,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def mark_read(self, request, pk=None):
         """Mark a specific notification as read"""
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read'])
+            invalidate_unread_counts([request.user.id])
+            publish_unread_changed(request.user.id)
         
         return Response({
             'message': 'Notification marked as read'
@@ -146,50 +186,117 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        """Get count of unread notifications"""
-        count = Notification.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).count()
-        
-        return Response({'count': count})
+        """Get count of unread notifications (cached per user)"""
+        return Response({'count': get_unread_count(request.user.id)})
 
 
-class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ActivityLogViewSet(ReplicaReadsMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = ('list', 'retrieve', 'heatmap')
 
-    def get_queryset(self):
+    pagination_class = ActivityCursorPagination
+
+    def accessible_projects(self):
+        """Live projects whose activity the user may see"""
         user = self.request.user
+        projects = Project.objects.all()
+        if user.role != 'admin':
+            projects = projects.filter(Q(members=user) | Q(created_by=user))
+        return projects
+
+    def get_queryset(self):
+        """
+        Activity rows carry their resolved project, so every feed is a scan of
+        the (project, -created_at, -id) index restricted to accessible projects
+        """
+        queryset = ActivityLog.objects.filter(project_id__in=self.accessible_projects().values('id'))
         
         # Filter by project if provided
         project_id = self.request.query_params.get('project', None)
         if project_id:
-            if user.role == 'admin':
-                queryset = ActivityLog.objects.filter(project_id=project_id)
-            else:
-                queryset = ActivityLog.objects.filter(
-                    Q(project_id=project_id) & 
-                    (Q(project__members=user) | Q(project__created_by=user))
-                )
+            queryset = queryset.filter(project_id=project_id)
         # Filter by task if provided
         elif self.request.query_params.get('task', None):
-            task_id = self.request.query_params.get('task')
-            if user.role == 'admin':
-                queryset = ActivityLog.objects.filter(task_id=task_id)
-            else:
-                queryset = ActivityLog.objects.filter(
-                    Q(task_id=task_id) & 
-                    (Q(task__project__members=user) | Q(task__project__created_by=user))
-                )
-        # Return all activities for user's projects
-        else:
-            if user.role == 'admin':
-                queryset = ActivityLog.objects.all()
-            else:
-                queryset = ActivityLog.objects.filter(
-                    Q(project__members=user) | Q(project__created_by=user) |
-                    Q(task__project__members=user) | Q(task__project__created_by=user)
-                )
+            queryset = queryset.filter(task_id=self.request.query_params.get('task'))
+        
+        # Hide activity on soft-deleted tasks until they are purged (projects
+        # are already excluded by the default manager above)
+        deleted_tasks = Task.all_objects.deleted().values('id')
+        queryset = queryset.exclude(task_id__in=deleted_tasks)
         
         return queryset.select_related('user', 'task', 'project')
+
+    @action(detail=False, methods=['get'])
+    def heatmap(self, request):
+        """
+        Contribution heatmap from the daily counters.
+        Filter by `user` and/or `project` (defaults to the current user);
+        `year=YYYY` selects a calendar year, otherwise the last 365 days.
+        """
+        params = {}
+        for name in ('user', 'project', 'year'):
+            value = request.query_params.get(name)
+            if value:
+                if not value.isdigit():
+                    return Response({
+                        'error': f'{name} must be an integer'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                params[name] = int(value)
+        
+        counts = ActivityDailyCount.objects.filter(project_id__in=self.accessible_projects().values('id'))
+        if 'project' in params:
+            counts = counts.filter(project_id=params['project'])
+        if 'user' in params or 'project' not in params:
+            counts = counts.filter(user_id=params.get('user', request.user.id))
+        
+        try:
+            start, end = heatmap.date_range(params.get('year'))
+        except ValueError:
+            return Response({'error': 'Invalid year'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(heatmap.contributions(counts, start, end))
+
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """
+        Read-only access to archived activity.
+        Without `month` lists the archived months; with `month=YYYY-MM`
+        returns that month's records (filterable by project, task, user).
+        """
+        month = request.query_params.get('month')
+        if not month:
+            return Response({'months': retention.archive_months()})
+        if not retention.ARCHIVE_MONTH.match(month):
+            return Response({
+                'error': 'month must be in YYYY-MM format'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        def int_param(name):
+            value = request.query_params.get(name)
+            return int(value) if value and value.isdigit() else None
+        
+        user = request.user
+        project_ids = None
+        if user.role != 'admin':
+            project_ids = set(Project.objects.filter(
+                Q(members=user) | Q(created_by=user)
+            ).values_list('id', flat=True))
+        project_id = int_param('project')
+        if project_id is not None:
+            if project_ids is not None and project_id not in project_ids:
+                return Response({'error': 'Access denied to this project'}, status=status.HTTP_403_FORBIDDEN)
+            project_ids = {project_id}
+        
+        # Newest first, like the live feed; pages are streamed from the file,
+        # the recent ones in the same pass that counts
+        paginator = PageNumberPagination()
+        page_size = paginator.get_page_size(request)
+        records = retention.NewestFirstArchive(
+            month,
+            keep=page_size * (int_param(paginator.page_query_param) or 1),
+            project_ids=project_ids,
+            task_id=int_param('task'),
+            user_id=int_param('user'),
+        )
+        page = paginator.paginate_queryset(records, request, view=self)
+        return paginator.get_paginated_response(page)
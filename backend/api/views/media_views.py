@@ -0,0 +1,38 @@
+import mimetypes
+import re
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from api.services.thumbnails import THUMBNAIL_DIR
+
+
+THUMBNAIL_NAME = re.compile(r'^[0-9a-f]{64}\.(webp|jpg|png)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+@require_GET
+def thumbnail(request, name):
+    """
+    Serve a content-hashed thumbnail with far-future cache headers.
+    With MEDIA_X_SENDFILE set ('X-Sendfile' or 'X-Accel-Redirect') the web
+    server streams the file and Django only writes the headers.
+    """
+    if not THUMBNAIL_NAME.match(name):
+        raise Http404
+    path = f'{THUMBNAIL_DIR}/{name}'
+    if not default_storage.exists(path):
+        raise Http404
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    header = getattr(settings, 'MEDIA_X_SENDFILE', None)
+    if header == 'X-Accel-Redirect':
+        response = HttpResponse(content_type=content_type)
+        response[header] = settings.MEDIA_X_ACCEL_PREFIX + path
+    elif header:
+        response = HttpResponse(content_type=content_type)
+        response[header] = default_storage.path(path)
+    else:
+        response = FileResponse(default_storage.open(path, 'rb'), content_type=content_type)
+    response['Cache-Control'] = IMMUTABLE
+    return response
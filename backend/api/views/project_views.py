@@ -2,11 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.utils import timezone
+from datetime import date, timedelta
+from api.db_routers import ReplicaReadsMixin
 from api.models import Project
+from api.services.burndown import project_burndown
+from api.services.response_cache import access_dependencies, cached_response
+from api.services.single_flight import single_flight
 from api.serializers import ProjectSerializer, ProjectCreateUpdateSerializer
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for Project CRUD operations"""
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
@@ -26,6 +32,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return ProjectCreateUpdateSerializer
         return ProjectSerializer
 
+    @single_flight()
+    @cached_response(
+        lambda view, request, kwargs: access_dependencies(request.user),
+        lambda view, request, kwargs: [
+            ('project', project_id)
+            for project_id in view.filter_queryset(view.get_queryset()).values_list('id', flat=True)
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cached_response(
+        lambda view, request, kwargs: access_dependencies(request.user) + [('project', kwargs['pk'])]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Set the creator when creating a project"""
         # Allow admin to specify created_by, otherwise use request.user
@@ -47,6 +70,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if new_creator and new_creator not in project.members.all():
             project.members.add(new_creator)
 
+    def perform_destroy(self, instance):
+        """Soft-delete; tasks and dependents are purged in the background"""
+        instance.soft_delete()
+
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
         """Add a member to the project"""
@@ -92,3 +119,26 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response({
                 'error': 'User not found'
             }, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """
+        Daily burndown and cumulative-flow series rebuilt from status transitions.
+        Query params: start, end (YYYY-MM-DD, inclusive; default the last 30 days)
+        """
+        project = self.get_object()
+        
+        try:
+            end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else timezone.localdate()
+            start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else end - timedelta(days=29)
+        except ValueError:
+            return Response({
+                'error': 'start and end must be in YYYY-MM-DD format'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if start > end or (end - start).days >= 366:
+            return Response({
+                'error': 'start must not be after end, and the range is limited to one year'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(project_burndown(project.id, start, end))
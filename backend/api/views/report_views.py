@@ -2,14 +2,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q, Count, Avg
+from django.utils import timezone
 from datetime import datetime, timedelta
+from ..db_routers import replica_reads
 from ..models.project import Project
-from ..models.task import Task
+from ..models.task import Task, TaskTransition
 from ..models.user import User
+from ..services.flow import flow_metrics
+from ..services.single_flight import single_flight
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
+@single_flight(lambda request: 'staff' if request.user.is_staff else f'user:{request.user.pk}')
 def admin_reports(request):
     """
     Generate comprehensive reports for admin users.
@@ -151,6 +157,7 @@ def admin_reports(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def user_reports(request):
     """
     Generate scoped reports for regular users.
@@ -292,3 +299,66 @@ def user_reports(request):
             'project_id': project_id
         }
     })
+
+
+def _parse_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@replica_reads
+def flow_reports(request):
+    """
+    Cycle/lead time percentiles (hours) and throughput from task status
+    transitions, for tasks completed in the window.
+    Query params: start_date, end_date (default: last 90 days), project_id
+    """
+    user = request.user
+    project_id = request.GET.get('project_id')
+    
+    try:
+        end = _parse_datetime(request.GET['end_date']) if request.GET.get('end_date') else timezone.now()
+        start = _parse_datetime(request.GET['start_date']) if request.GET.get('start_date') else end - timedelta(days=90)
+    except ValueError:
+        return Response({'error': 'Dates must be in ISO 8601 format'}, status=400)
+    if project_id and not project_id.isdigit():
+        return Response({'error': 'project_id must be an integer'}, status=400)
+    
+    projects_query = Project.objects.all()
+    if user.role != 'admin':
+        projects_query = projects_query.filter(Q(created_by=user) | Q(members=user))
+    if project_id:
+        if not projects_query.filter(id=project_id).exists():
+            return Response({'error': 'Access denied to this project'}, status=403)
+        projects_query = projects_query.filter(id=project_id)
+    
+    transitions = TaskTransition.objects.filter(
+        project_id__in=projects_query.values('id'),
+        task__deleted_at__isnull=True
+    )
+    metrics = flow_metrics(transitions, start, end)
+    
+    project_names = dict(Project.objects.filter(id__in=metrics['projects']).values_list('id', 'title'))
+    users = {
+        member.id: f"{member.first_name} {member.last_name}"
+        for member in User.objects.filter(id__in=metrics['assignees']).only('id', 'first_name', 'last_name')
+    }
+    
+    return Response({
+        'overall': metrics['overall'],
+        'projects': [
+            {'project_id': key, 'project_name': project_names.get(key), **summary}
+            for key, summary in metrics['projects'].items()
+        ],
+        'assignees': [
+            {'user_id': key or None, 'name': users.get(key, 'Unassigned'), **summary}
+            for key, summary in metrics['assignees'].items()
+        ],
+        'filters': {
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'project_id': project_id
+        }
+    })
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from api.models import Notification
+from api.realtime import get_broker
+from api.serializers import NotificationSerializer
+from api.services.unread import get_unread_count
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _int_param(request, name, default, low, high):
+    try:
+        value = int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(low, min(high, value))
+
+
+def _authenticate(request):
+    """
+    (user, error response) from DRF's DEFAULT_AUTHENTICATION_CLASSES, so
+    token clients work too; these are plain async views to avoid holding a
+    thread while they wait
+    """
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        user = Request(request, authenticators=authenticators).user
+    except exceptions.AuthenticationFailed as exc:
+        return AnonymousUser(), JsonResponse({'detail': str(exc.detail)}, status=401)
+    if user is None or not user.is_authenticated:
+        return AnonymousUser(), JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return user, None
+
+
+def _bell_state(user_id, limit):
+    latest = list(
+        Notification.objects.visible_to(user_id)
+        .select_related('sender', 'task', 'comment')
+        .order_by('-created_at', '-id')[:limit]
+    )
+    last_id = Notification.objects.visible_to(user_id).order_by('-id').values_list('id', flat=True).first()
+    return {
+        'count': get_unread_count(user_id),
+        'last_id': last_id or 0,
+        'results': NotificationSerializer(latest, many=True).data,
+    }
+
+
+async def notification_bell(request):
+    """
+    Unread count plus the latest notifications in one response.
+
+    Query params: limit (default 10), since (last seen notification id),
+    count (unread count the client shows) and wait (seconds, capped by
+    NOTIFICATION_LONG_POLL_MAX). With `since` and `wait`, the request is
+    held until a newer notification or any unread-count change arrives, so
+    an idle client keeps one cheap pending request instead of polling.
+    Under WSGI a held request pins a worker thread, so the hold is capped at
+    NOTIFICATION_LONG_POLL_WSGI_MAX and the response carries `retry_after`,
+    the rest of the requested wait.
+    """
+    user, error = await sync_to_async(_authenticate)(request)
+    if error is not None:
+        return error
+
+    limit = _int_param(request, 'limit', 10, 1, 50)
+    requested = _int_param(request, 'wait', 0, 0, getattr(settings, 'NOTIFICATION_LONG_POLL_MAX', 30))
+    wait = requested
+    if not isinstance(request, ASGIRequest):
+        wait = min(wait, getattr(settings, 'NOTIFICATION_LONG_POLL_WSGI_MAX', 0))
+    since = request.GET.get('since')
+    since = int(since) if since and since.isdigit() else None
+    seen_count = request.GET.get('count')
+    seen_count = int(seen_count) if seen_count and seen_count.isdigit() else None
+
+    # Subscribe before reading state so a change in between still wakes us
+    subscription = await get_broker().asubscribe(user.id) if wait and since is not None else None
+    try:
+        state = await sync_to_async(_bell_state)(user.id, limit)
+        unchanged = state['last_id'] <= (since or 0) and seen_count in (None, state['count'])
+        if subscription is not None and unchanged:
+            try:
+                await asyncio.wait_for(anext(subscription), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                state = await sync_to_async(_bell_state)(user.id, limit)
+    finally:
+        if subscription is not None:
+            await subscription.aclose()
+
+    if requested > wait:
+        state['retry_after'] = requested - wait
+    return JsonResponse(state)
+
+
+def _notification_payloads(user_id, ids):
+    notifications = Notification.objects.filter(
+        recipient_id=user_id, id__in=ids
+    ).select_related('sender', 'task', 'comment').order_by('id')
+    return NotificationSerializer(notifications, many=True).data
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events stream of the user's new notifications and unread
+    count. Only served under ASGI; under WSGI it would pin a worker thread,
+    so clients get 501 and fall back to polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Streaming requires the ASGI server'}, status=501)
+
+    user, error = await sync_to_async(_authenticate)(request)
+    if error is not None:
+        return error
+
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+
+    async def events():
+        # Subscribe before reading the count so nothing slips in between
+        subscription = await get_broker().asubscribe(user.id)
+        try:
+            count = await sync_to_async(get_unread_count)(user.id)
+            yield _event('unread_count', {'count': count})
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(anext(subscription), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+
+                if event['type'] == 'notification':
+                    payloads = await sync_to_async(_notification_payloads)(user.id, event['ids'])
+                    for payload in payloads:
+                        yield _event('notification', payload)
+                count = await sync_to_async(get_unread_count)(user.id)
+                yield _event('unread_count', {'count': count})
+        finally:
+            await subscription.aclose()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
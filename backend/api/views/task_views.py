@@ -2,15 +2,21 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from api.models import Task, Project, ActivityLog, Notification
+from django.db import transaction
+from api.db_routers import ReplicaReadsMixin
+from api.models import Task, Project, TaskTransition
+from api.services import outbox
+from api.services.activity import log_activity
+from api.services.response_cache import access_dependencies, cached_response
 from api.serializers import TaskSerializer, TaskCreateUpdateSerializer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for Task CRUD operations"""
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = ('list', 'retrieve', 'my_tasks', 'by_project')
 
     def get_queryset(self):
         """Filter tasks based on user role and project membership"""
@@ -55,12 +61,14 @@ class TaskViewSet(viewsets.ModelViewSet):
             return TaskCreateUpdateSerializer
         return TaskSerializer
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Set the creator when creating a task"""
         task = serializer.save(created_by=self.request.user)
+        TaskTransition.record(task, '', self.request.user)
         
-        # Create activity log
-        ActivityLog.objects.create(
+        # Log the activity (written in bulk after commit)
+        log_activity(
             user=self.request.user,
             action_type='created',
             task=task,
@@ -68,26 +76,22 @@ class TaskViewSet(viewsets.ModelViewSet):
             description=f"created task: {task.title}"
         )
         
-        # Notify assigned user if set
-        if task.assigned_to and task.assigned_to != self.request.user:
-            Notification.objects.create(
-                recipient=task.assigned_to,
-                sender=self.request.user,
-                notification_type='task_assigned',
-                task=task,
-                message=f"{self.request.user.get_full_name()} assigned you to task: {task.title}"
-            )
+        # Notify assigned user if set (expanded by the outbox dispatcher)
+        if task.assigned_to_id:
+            outbox.enqueue('task_created', self.request.user, task=task.id, assigned_to=task.assigned_to_id)
     
+    @transaction.atomic
     def perform_update(self, serializer):
         """Track task updates and status changes"""
         old_task = self.get_object()
         old_status = old_task.status
+        old_project_id = old_task.project_id
         old_assigned_to = old_task.assigned_to
         
         task = serializer.save()
         
-        # Create activity log for update
-        ActivityLog.objects.create(
+        # Log the update (written in bulk after commit)
+        log_activity(
             user=self.request.user,
             action_type='updated',
             task=task,
@@ -95,48 +99,54 @@ class TaskViewSet(viewsets.ModelViewSet):
             description=f"updated task: {task.title}"
         )
         
+        # A move to another project is recorded as a transition into it
+        if old_status != task.status or old_project_id != task.project_id:
+            TaskTransition.record(task, old_status, self.request.user)
+
         # Check for status change
         if old_status != task.status:
-            ActivityLog.objects.create(
+            log_activity(
                 user=self.request.user,
                 action_type='status_changed',
                 task=task,
                 project=task.project,
-                description=f"changed status from {old_status} to {task.status}"
+                description=f"changed status from {old_status} to {task.status}",
+                metadata={'from': old_status, 'to': task.status}
             )
-            
-            # Notify assigned user of status change
-            if task.assigned_to and task.assigned_to != self.request.user:
-                Notification.objects.create(
-                    recipient=task.assigned_to,
-                    sender=self.request.user,
-                    notification_type='task_updated',
-                    task=task,
-                    message=f"{self.request.user.get_full_name()} changed task status to {task.status}: {task.title}"
-                )
         
         # Check for assignment change
-        if old_assigned_to != task.assigned_to:
-            if task.assigned_to:
-                ActivityLog.objects.create(
-                    user=self.request.user,
-                    action_type='assigned',
-                    task=task,
-                    project=task.project,
-                    description=f"assigned task to {task.assigned_to.get_full_name()}"
-                )
-                
-                # Notify new assignee
-                if task.assigned_to != self.request.user:
-                    Notification.objects.create(
-                        recipient=task.assigned_to,
-                        sender=self.request.user,
-                        notification_type='task_assigned',
-                        task=task,
-                        message=f"{self.request.user.get_full_name()} assigned you to task: {task.title}"
-                    )
+        if old_assigned_to != task.assigned_to and task.assigned_to:
+            log_activity(
+                user=self.request.user,
+                action_type='assigned',
+                task=task,
+                project=task.project,
+                description=f"assigned task to {task.assigned_to.get_full_name()}"
+            )
+        
+        # Status and assignment notifications are expanded by the outbox dispatcher
+        if old_status != task.status or old_assigned_to != task.assigned_to:
+            outbox.enqueue(
+                'task_updated', self.request.user,
+                task=task.id,
+                old_status=old_status,
+                status=task.status,
+                old_assigned_to=old_assigned_to.id if old_assigned_to else None,
+                assigned_to=task.assigned_to_id
+            )
+
+    def perform_destroy(self, instance):
+        """Soft-delete; comments and notifications are purged in the background"""
+        instance.soft_delete()
 
     @action(detail=False, methods=['get'])
+    @cached_response(
+        lambda view, request, kwargs: [('users', 'all'), ('user-tasks', request.user.pk)],
+        lambda view, request, kwargs: [
+            ('project', project_id)
+            for project_id in Task.objects.filter(assigned_to=request.user).values_list('project_id', flat=True).distinct()
+        ]
+    )
     def my_tasks(self, request):
         """Get tasks assigned to current user"""
         tasks = Task.objects.filter(assigned_to=request.user)
@@ -144,6 +154,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cached_response(
+        lambda view, request, kwargs: (
+            access_dependencies(request.user) + [('project', request.query_params.get('project_id'))]
+        )
+    )
     def by_project(self, request):
         """Get tasks by project ID"""
         project_id = request.query_params.get('project_id')
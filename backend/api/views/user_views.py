@@ -2,11 +2,21 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
+from rest_framework.filters import OrderingFilter
+import io
 from django.contrib.auth import login, logout
-from django.db.models import Count
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower
+from api.authentication import invalidate_user
+from api.db_routers import ReplicaReadsMixin
 from api.models import User, Project, Task
+from api.pagination import UserCursorPagination
+from api.services.response_cache import cached_response
+from api.services.user_import import import_users
+from api.services.user_search import prefix_search
 from api.serializers import (
     UserSerializer, 
+    UserDirectorySerializer,
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserProfileSerializer
@@ -19,11 +29,25 @@ class IsAdmin(BasePermission):
         return request.user and request.user.is_authenticated and request.user.role == 'admin'
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def _count(queryset, user_field):
+    """Correlated per-user COUNT(*) of `queryset` as an integer expression"""
+    counted = (
+        queryset.filter(**{user_field: OuterRef('pk')})
+        .order_by().values(user_field).annotate(n=Count('*')).values('n')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+class UserViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for User CRUD operations"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = ('list', 'retrieve', 'available', 'autocomplete')
+    # The admin directory: keyset pages, sortable on the stats columns
+    pagination_class = UserCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['username', 'email', 'first_name', 'last_name', 'date_joined', 'project_count', 'task_count']
 
     def get_permissions(self):
         """Allow public access to register and login, admin for CRUD"""
@@ -37,33 +61,34 @@ class UserViewSet(viewsets.ModelViewSet):
         """Filter users based on role"""
         user = self.request.user
         if user.role == 'admin':
-            # Annotate with project and task counts
+            # Counts as correlated subqueries: one query, no join fan-out
+            memberships = Project.members.through.objects.filter(project__deleted_at__isnull=True)
             return User.objects.annotate(
-                project_count=Count('created_projects', distinct=True) + Count('projects', distinct=True),
-                task_count=Count('assigned_tasks', distinct=True)
-            ).all()
+                project_count=(
+                    _count(Project.objects.all(), 'created_by') +
+                    _count(memberships, 'user')
+                ),
+                task_count=_count(Task.objects.all(), 'assigned_to')
+            )
         return User.objects.filter(id=user.id)
 
-    def list(self, request):
-        """List all users with statistics"""
-        queryset = self.get_queryset()
-        users_data = []
-        
-        for user in queryset:
-            # Calculate statistics
-            created_projects = Project.objects.filter(created_by=user).count()
-            member_projects = user.projects.count()
-            total_projects = created_projects + member_projects
-            assigned_tasks = Task.objects.filter(assigned_to=user).count()
-            
-            user_dict = UserSerializer(user).data
-            user_dict['project_count'] = total_projects
-            user_dict['task_count'] = assigned_tasks
-            user_dict['status'] = 'active' if user.is_active else 'inactive'
-            user_dict['full_name'] = f"{user.first_name} {user.last_name}".strip() or user.username
-            users_data.append(user_dict)
-        
-        return Response(users_data)
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UserDirectorySerializer
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        """
+        ?ordering= and prefix search on username, email and name via ?search=,
+        for the admin directory only: other actions lack the count annotations
+        """
+        if self.action != 'list':
+            return queryset
+        queryset = super().filter_queryset(queryset)
+        search = self.request.query_params.get('search', '')
+        if search:
+            queryset = prefix_search(queryset, search)
+        return queryset
 
     def create(self, request):
         """Create a new user (admin only)"""
@@ -124,6 +149,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 user.set_password(password)
             
             user.save()
+            invalidate_user(user.id)
             
             return Response({
                 'message': 'User updated successfully',
@@ -155,12 +181,14 @@ class UserViewSet(viewsets.ModelViewSet):
                 # Soft delete by deactivating
                 user.is_active = False
                 user.save()
+                invalidate_user(user.id)
                 return Response({
                     'message': f'User deactivated (has {created_projects} projects and {assigned_tasks} tasks)'
                 })
             else:
                 # Hard delete if no dependencies
                 username = user.username
+                invalidate_user(user.id)
                 user.delete()
                 return Response({
                     'message': f'User {username} deleted successfully'
@@ -212,6 +240,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserProfileSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate_user(user.id)
             return Response({
                 'message': 'Profile updated successfully',
                 'user': serializer.data
@@ -225,6 +254,7 @@ class UserViewSet(viewsets.ModelViewSet):
             user = User.objects.get(pk=pk)
             user.is_active = not user.is_active
             user.save()
+            invalidate_user(user.id)
             return Response({
                 'message': f'User {"activated" if user.is_active else "deactivated"} successfully',
                 'user': UserSerializer(user).data
@@ -233,6 +263,7 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
     @action(detail=False, methods=['get'])
+    @cached_response(lambda view, request, kwargs: [('users', 'all')], shared=True)
     def available(self, request):
         """Get list of available users (for adding to projects)"""
         # Get all active users with role 'user'
@@ -240,6 +271,56 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = UserSerializer(users, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Top matches for member pickers, served from the LOWER(...) indexes.
+        Query params: q (prefix of username, email, first or last name),
+        limit (default 10, max 50), project (exclude its creator and members)
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        users = User.objects.filter(is_active=True, role='user')
+        project_id = request.query_params.get('project')
+        if project_id and project_id.isdigit():
+            users = users.exclude(
+                Q(projects__id=project_id) | Q(created_projects__id=project_id)
+            )
+        users = prefix_search(users, request.query_params.get('q', ''))
+        
+        matches = users.order_by(Lower('username')).values(
+            'id', 'username', 'email', 'first_name', 'last_name'
+        )[:limit]
+        return Response(list(matches))
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAdmin])
+    def import_csv(self, request):
+        """
+        Bulk-create users from an uploaded CSV (`file`); see
+        api.services.user_import for the columns. `projects` (comma-separated
+        ids) adds every imported user to those projects. Invalid rows are
+        reported per line and do not stop the import. Passwords are hashed
+        in this worker; large files belong to the import_users command.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        projects = request.data.get('projects', '')
+        try:
+            project_ids = [int(value) for value in projects.split(',') if value.strip()]
+        except ValueError:
+            return Response({'error': 'projects must be comma-separated ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = import_users(lines, project_ids, workers=1)
+        except UnicodeDecodeError:
+            return Response({'error': 'file must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report.as_dict(), status=status.HTTP_201_CREATED if report.created else status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'], url_path='change-password')
     def change_password(self, request):
         """Change user password"""
@@ -269,6 +350,7 @@ class UserViewSet(viewsets.ModelViewSet):
         # Set new password
         user.set_password(new_password)
         user.save()
+        invalidate_user(user.id)
 
         # Generate new token after password change
         from rest_framework.authtoken.models import Token
@@ -308,6 +390,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
         # Delete the account
         username = user.username
+        invalidate_user(user.id)
         user.delete()
         
         # Logout
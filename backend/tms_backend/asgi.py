@@ -3,6 +3,10 @@ ASGI config for tms_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The notification stream (/api/notifications/stream/) is only available when
+served through this module, e.g. ``uvicorn tms_backend.asgi:application``;
+under WSGI the frontend falls back to polling.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,9 +45,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.SessionRefreshMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -77,13 +80,90 @@ WSGI_APPLICATION = 'tms_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# DATABASE_PROFILE (environment variable) selects the database setup:
+#   'sqlite' - db.sqlite3 in WAL mode, so readers no longer wait for the
+#              writer; connections are kept open because the page cache and
+#              memory map below live per connection
+#   'server' - PostgreSQL (or DB_ENGINE) configured from the DB_* environment
+#              variables, with persistent connections checked before reuse
+# `python manage.py benchmark_database` compares read/write throughput.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # durable enough with WAL, one fsync per checkpoint
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64 * 1024,  # negative = KiB, i.e. 64 MiB
+    'temp_store': 'MEMORY',
+}
+DATABASE_PROFILES = {
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,  # seconds
+        'OPTIONS': {
+            # Take the write lock when a transaction starts and wait for it,
+            # so request transactions and background writers queue instead of
+            # failing with "database is locked" on lock upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # busy timeout, seconds
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+        },
+    },
+    'server': {
+        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.postgresql'),
+        'NAME': os.environ.get('DB_NAME', 'tms'),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),  # seconds
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+DATABASES = {
+    'default': DATABASE_PROFILES[DATABASE_PROFILE],
 }
 
+# Read replica (api.db_routers): list/retrieve actions, activity feeds and
+# reports read from it. Set DB_REPLICA to the replica's host ('server') or
+# to a copy of the database file ('sqlite'); unset, everything uses default.
+DATABASE_REPLICA_ALIAS = 'replica'
+if os.environ.get('DB_REPLICA'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST' if DATABASE_PROFILE == 'server' else 'NAME': os.environ['DB_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+# After a user writes, their reads stay on the primary this long (replica lag)
+REPLICA_STICKY_SECONDS = 10
+
+# Data versions, cached responses and their locks, single-flight results,
+# unread counts, replica sticky markers and cache-mode sessions must be seen
+# by every worker process, so they need a shared cache: Redis when REDIS_URL
+# is set (pip install redis). Without it the cache is per process and those
+# features switch off (see api.services.versions.is_shared): responses,
+# reports and unread counts are computed on every request, single-flight
+# coalesces within a process only and reads stay on the primary. Set
+# REDIS_URL whenever more than one process serves requests.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Cache hit/coalescing counters are summed in process and added to the
+# shared cache this often
+CACHE_STATS_FLUSH_INTERVAL = 5.0  # seconds
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,6 +213,7 @@ AUTH_USER_MODEL = 'api.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -166,11 +247,105 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 # Session Configuration
+# SESSION_MODE picks the storage: 'db' reads django_session on every request;
+# 'signed_cookie' keeps the session in the (signed) cookie itself; 'cache'
+# serves it from CACHES and writes it behind to the database (api.sessions).
+# `python manage.py benchmark_sessions` compares their per-request overhead.
+SESSION_MODE = 'db'
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookie': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'api.sessions',
+}
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_COOKIE_AGE = 60 * 60 * 24 * 14  # two weeks
+SESSION_REFRESH_WINDOW = 60 * 60 * 24  # re-save a session only this close to expiry
+SESSION_WRITE_BEHIND_INTERVAL = 5.0  # seconds, 'cache' mode only
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_HTTPONLY = True
 CSRF_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_HTTPONLY = False  # JavaScript needs to read this
 
+# Real-time notifications (served from /api/notifications/stream/ under ASGI)
+# InProcessBroker fans out within one process; RedisBroker (the default with
+# REDIS_URL) across processes and nodes through Redis pub/sub. DatabaseBroker
+# is a single-node fallback without Redis that polls the database once per
+# open stream every couple of seconds.
+NOTIFICATION_BROKER = (
+    'api.realtime.brokers.RedisBroker' if REDIS_URL else 'api.realtime.brokers.InProcessBroker'
+)
+NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds
+NOTIFICATION_LONG_POLL_MAX = 30  # seconds /api/notifications/bell/?wait= may hold
+# Under WSGI a held bell request pins a worker thread; hold it at most this
+# long and have the client retry after the rest of its wait
+NOTIFICATION_LONG_POLL_WSGI_MAX = 0  # seconds
+
+# Notification outbox dispatch: 'thread' expands queued events on a background
+# thread in the web process right after commit; 'worker' leaves them to
+# `python manage.py dispatch_notifications` (needs REDIS_URL, or the
+# DatabaseBroker fallback, so pushes reach the web processes)
+NOTIFICATION_DISPATCH = 'thread'
+NOTIFICATION_DISPATCH_BATCH_SIZE = 200
+
+# Unread notifications of these types are merged per (recipient, task) when
+# another arrives within the window (seconds)
+NOTIFICATION_COALESCE_WINDOWS = {
+    'task_updated': 3600,
+    'comment': 900,
+}
+
+# Unread notification counts are cached in the shared default cache (with
+# REDIS_URL; otherwise every read counts them)
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = 300  # seconds before recounting from the DB
+
+# Token -> user resolutions cached per process (api.authentication). With
+# REDIS_URL each hit checks the user's shared auth version, so revocation is
+# immediate everywhere; without it the TTL bounds how long other processes
+# keep accepting a revoked token
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TTL = 300 if REDIS_URL else 5  # seconds
+
+# Activity log entries are queued at commit and bulk-written by a background
+# flusher; 'sync' writes each entry inside the request's transaction instead
+ACTIVITY_LOG_MODE = 'buffered'
+ACTIVITY_LOG_BATCH_SIZE = 500
+ACTIVITY_LOG_FLUSH_INTERVAL = 1.0  # seconds
+ACTIVITY_LOG_QUEUE_SIZE = 10000  # producers wait (then write inline) when full
+ACTIVITY_LOG_PUT_TIMEOUT = 2.0  # seconds
+
+# Chart data (burndown, cumulative flow) is cached under each project's data
+# version, so this only bounds memory use, not staleness
+REPORT_CACHE_TIMEOUT = 3600  # seconds
+
+# Cached list responses (api.services.response_cache) are invalidated through
+# data versions bumped by model signals (api.signals) and always built from
+# the primary; the timeout only bounds memory use
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+RESPONSE_CACHE_LOCK_WAIT = 5.0  # seconds a request waits for another to build the entry
+
+# Identical concurrent requests to expensive views share one computation
+# (api.services.single_flight), across worker processes through the shared
+# cache unless this is False
+SINGLE_FLIGHT_CROSS_PROCESS = True
+SINGLE_FLIGHT_TIMEOUT = 30.0  # seconds a follower waits before computing itself
+
+# Retention enforced by `python manage.py enforce_retention` (days; None keeps forever)
+RETENTION = {
+    'read_notifications_days': 90,
+    'unread_notifications_days': None,
+    'activity_archive_days': 365,
+}
+# Archived activity is written here as activity-YYYY-MM.ndjson.gz
+ACTIVITY_ARCHIVE_DIR = BASE_DIR / 'archive' / 'activity'
+
 # Media Files Configuration
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Profile picture thumbnails (api.services.thumbnails)
+PROFILE_THUMBNAIL_SIZE = 128  # pixels, square
+PROFILE_THUMBNAIL_FORMAT = 'WEBP'  # or 'JPEG' / 'PNG'
+# Let the web server send thumbnail files: None, 'X-Sendfile' (Apache,
+# lighttpd) or 'X-Accel-Redirect' (nginx, internal location below)
+MEDIA_X_SENDFILE = None
+MEDIA_X_ACCEL_PREFIX = '/protected-media/'
\ No newline at end of file
@@ -3,11 +3,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from api.views.api_root import api_root
+from api.views.media_views import thumbnail
 
 urlpatterns = [
     path('', api_root, name='api-root'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    # Content-hashed avatars, served with far-future cache headers in every mode
+    path(f"{settings.MEDIA_URL.strip('/')}/thumbnails/<str:name>", thumbnail, name='thumbnail'),
 ]
 
 # Serve media files during development
@@ -12,6 +12,8 @@ export interface Comment {
         last_name: string;
     };
     content: string;
+    content_html: string;
+    mentioned_user_ids: number[];
     created_at: string;
     updated_at: string;
     parent: number | null;
@@ -20,6 +22,12 @@ export interface Comment {
     replies_count: number;
 }
 
+export interface ReplyPage {
+    next: string | null;
+    previous: string | null;
+    results: Comment[];
+}
+
 export interface Notification {
     id: number;
     recipient: number;
@@ -30,15 +38,24 @@ export interface Notification {
         first_name: string;
         last_name: string;
     } | null;
-    notification_type: 'comment' | 'mention' | 'task_assigned' | 'task_updated' | 'project_added';
+    notification_type: 'comment' | 'mention' | 'task_assigned' | 'task_updated' | 'project_added' | 'digest';
     task: number | null;
     task_title: string | null;
     comment: number | null;
     message: string;
     is_read: boolean;
+    occurrences: number;
     created_at: string;
 }
 
+export interface NotificationBellState {
+    count: number;
+    last_id: number;
+    results: Notification[];
+    // Seconds to wait before polling again when the server could not hold the request
+    retry_after?: number;
+}
+
 export interface ActivityLog {
     id: number;
     user: number;
@@ -58,6 +75,15 @@ export interface ActivityLog {
     created_at: string;
 }
 
+export interface ActivityHeatmap {
+    start: string;
+    end: string;
+    total: number;
+    max: number;
+    days: number[];  // one count per day from start to end
+    by_action: Record<ActivityLog['action_type'], number>;
+}
+
 export const commentService = {
     // Get comments for a task
     getTaskComments: async (taskId: number): Promise<Comment[]> => {
@@ -65,6 +91,17 @@ export const commentService = {
         return response.data;
     },
 
+    // Get a page of replies for a comment (pass the `next` URL to continue)
+    getReplies: async (commentId: number, nextUrl?: string | null): Promise<ReplyPage> => {
+        let path = `/comments/${commentId}/replies/`;
+        if (nextUrl) {
+            const url = new URL(nextUrl);
+            path = url.pathname.replace('/api', '') + url.search;
+        }
+        const response = await api.get(path);
+        return response.data;
+    },
+
     // Create a comment
     createComment: async (data: { task: number; content: string; parent?: number }): Promise<Comment> => {
         const response = await api.post('/comments/', data);
@@ -101,6 +138,17 @@ export const notificationService = {
         await api.post('/notifications/mark_all_read/');
     },
 
+    // Get unread count and latest notifications in one request; with `since`
+    // and `wait` the server holds the request until something changes
+    getBell: async (params?: { limit?: number; since?: number; count?: number; wait?: number }): Promise<NotificationBellState> => {
+        const response = await api.get('/notifications/bell/', {
+            params,
+            // Leave room for the server-side wait
+            timeout: params?.wait ? (params.wait + 10) * 1000 : undefined,
+        });
+        return response.data;
+    },
+
     // Get unread count
     getUnreadCount: async (): Promise<number> => {
         const response = await api.get('/notifications/unread_count/');
@@ -111,6 +159,14 @@ export const notificationService = {
     deleteNotification: async (id: number): Promise<void> => {
         await api.delete(`/notifications/${id}/`);
     },
+
+    // Open the server-sent event stream of new notifications and unread counts
+    openStream: (): EventSource => {
+        const baseURL = api.defaults.baseURL || '';
+        return new EventSource(`${baseURL.replace(/\/$/, '')}/notifications/stream/`, {
+            withCredentials: true,
+        });
+    },
 };
 
 export const activityService = {
@@ -154,4 +210,10 @@ export const activityService = {
         
         return allActivities;
     },
+
+    // Get a contribution heatmap (defaults to the current user, last 365 days)
+    getHeatmap: async (params: { user?: number; project?: number; year?: number } = {}): Promise<ActivityHeatmap> => {
+        const response = await api.get('/activities/heatmap/', { params });
+        return response.data;
+    },
 };
@@ -39,6 +39,18 @@ export interface CreateProjectData {
 
 export interface UpdateProjectData extends CreateProjectData {}
 
+export type TaskStatus = 'todo' | 'in_progress' | 'completed';
+
+export interface ProjectBurndown {
+    start: string;
+    end: string;
+    dates: string[];
+    statuses: TaskStatus[];
+    cumulative_flow: Record<TaskStatus, number[]>;  // one count per date
+    remaining: number[];
+    ideal: number[];
+}
+
 class ProjectService {
     async getAllProjects(): Promise<Project[]> {
         const response = await api.get('projects/');
@@ -76,6 +88,11 @@ class ProjectService {
             user_id: userId,
         });
     }
+
+    async getBurndown(projectId: number, range: { start?: string; end?: string } = {}): Promise<ProjectBurndown> {
+        const response = await api.get(`projects/${projectId}/burndown/`, { params: range });
+        return response.data;
+    }
 }
 
 export const projectService = new ProjectService();
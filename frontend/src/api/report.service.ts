@@ -63,6 +63,27 @@ export interface ReportFilters {
     project_id?: string;
 }
 
+export interface TimePercentiles {
+    count: number;
+    p50: number | null;
+    p85: number | null;
+    p95: number | null;
+}
+
+export interface FlowSummary {
+    lead_time_hours: TimePercentiles;
+    cycle_time_hours: TimePercentiles;
+    throughput: number;
+    throughput_per_week: number;
+}
+
+export interface FlowReport {
+    overall: FlowSummary;
+    projects: (FlowSummary & { project_id: number; project_name: string | null })[];
+    assignees: (FlowSummary & { user_id: number | null; name: string })[];
+    filters: ReportFilters;
+}
+
 class ReportService {
     async getAdminReports(filters?: ReportFilters): Promise<ReportData> {
         const params = new URLSearchParams();
@@ -83,6 +104,16 @@ class ReportService {
         const response = await axios.get(`/reports/user/?${params.toString()}`);
         return response.data;
     }
+
+    async getFlowReport(filters?: ReportFilters): Promise<FlowReport> {
+        const params = new URLSearchParams();
+        if (filters?.start_date) params.append('start_date', filters.start_date);
+        if (filters?.end_date) params.append('end_date', filters.end_date);
+        if (filters?.project_id) params.append('project_id', filters.project_id);
+
+        const response = await axios.get(`/reports/flow/?${params.toString()}`);
+        return response.data;
+    }
 }
 
 export const reportService = new ReportService();
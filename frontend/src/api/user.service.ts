@@ -9,6 +9,7 @@ export interface User {
   phone: string | null;
   role: 'admin' | 'user';
   profile_picture: string | null;
+  profile_thumbnail: string | null;  // small, cacheable avatar; use for lists
   date_joined: string;
   is_active: boolean;
   project_count?: number;
@@ -40,13 +41,49 @@ export interface UpdateUserData {
   password2?: string;
 }
 
+export type UserMatch = Pick<User, 'id' | 'username' | 'email' | 'first_name' | 'last_name'>;
+
+export interface UserPage {
+  next: string | null;
+  previous: string | null;
+  results: User[];
+}
+
+export interface UserImportReport {
+  rows: number;
+  created: number;
+  memberships: number;
+  errors: { line: number; errors: Record<string, string> }[];
+}
+
+export interface UserDirectoryParams {
+  search?: string;  // prefix of username, email, first or last name
+  ordering?: 'username' | '-username' | 'email' | '-email' | 'date_joined' | '-date_joined'
+    | 'project_count' | '-project_count' | 'task_count' | '-task_count';
+  page_size?: number;
+  cursor?: string;  // a `next`/`previous` URL from a previous page
+}
+
 export const userService = {
-  // Get all users (admin only)
-  getAllUsers: async (): Promise<User[]> => {
-    const response = await api.get<User[]>('users/');
+  // Get one page of the user directory (admin only)
+  getUserPage: async (params: UserDirectoryParams = {}): Promise<UserPage> => {
+    const { cursor, ...query } = params;
+    const response = await api.get<UserPage>(cursor || 'users/', { params: cursor ? undefined : query });
     return response.data;
   },
 
+  // Get all users (admin only), following the directory's cursor pages
+  getAllUsers: async (): Promise<User[]> => {
+    let users: User[] = [];
+    let page = await userService.getUserPage({ page_size: 500 });
+    users = users.concat(page.results);
+    while (page.next) {
+      page = await userService.getUserPage({ cursor: page.next });
+      users = users.concat(page.results);
+    }
+    return users;
+  },
+
   // Get single user
   getUser: async (id: number): Promise<User> => {
     const response = await api.get<User>(`users/${id}/`);
@@ -88,4 +125,22 @@ export const userService = {
     const response = await api.get<User[]>('users/available/');
     return response.data;
   },
+
+  // Typeahead for member pickers: top matches by name/username/email prefix
+  autocompleteUsers: async (
+    q: string,
+    options: { project?: number; limit?: number } = {}
+  ): Promise<UserMatch[]> => {
+    const response = await api.get<UserMatch[]>('users/autocomplete/', { params: { q, ...options } });
+    return response.data;
+  },
+
+  // Bulk-create users from a CSV file (admin only); invalid rows are reported by line
+  importUsers: async (file: File, projectIds: number[] = []): Promise<UserImportReport> => {
+    const data = new FormData();
+    data.append('file', file);
+    if (projectIds.length) data.append('projects', projectIds.join(','));
+    const response = await api.post<UserImportReport>('users/import/', data);
+    return response.data;
+  },
 };
@@ -30,6 +30,7 @@ export function Comments({ taskId }: CommentsProps) {
     const [editContent, setEditContent] = useState('');
     const [replyingTo, setReplyingTo] = useState<number | null>(null);
     const [replyContent, setReplyContent] = useState('');
+    const [loadedReplies, setLoadedReplies] = useState<Record<number, { replies: Comment[]; next: string | null }>>({});
     const [projectMembers, setProjectMembers] = useState<any[]>([]);
     const [showSuggestions, setShowSuggestions] = useState(false);
     const [mentionSearch, setMentionSearch] = useState('');
@@ -53,6 +54,7 @@ export function Comments({ taskId }: CommentsProps) {
             );
 
             setComments(uniqueComments);
+            setLoadedReplies({});
         } catch (error) {
             console.error('Error loading comments:', error);
             toast.error('Failed to load comments');
@@ -151,6 +153,23 @@ export function Comments({ taskId }: CommentsProps) {
         }
     };
 
+    const loadMoreReplies = async (commentId: number) => {
+        try {
+            const current = loadedReplies[commentId];
+            const page = await commentService.getReplies(commentId, current?.next);
+            setLoadedReplies((prev) => ({
+                ...prev,
+                [commentId]: {
+                    replies: [...(current?.replies || []), ...page.results],
+                    next: page.next,
+                },
+            }));
+        } catch (error) {
+            console.error('Error loading replies:', error);
+            toast.error('Failed to load replies');
+        }
+    };
+
     const handleCommentChange = (value: string) => {
         setNewComment(value);
 
@@ -200,6 +219,10 @@ export function Comments({ taskId }: CommentsProps) {
     const CommentItem = ({ comment, isReply = false }: { comment: Comment; isReply?: boolean }) => {
         const initials = `${comment.user_details.first_name[0]}${comment.user_details.last_name[0]}`;
         const isOwner = user?.id === comment.user;
+        // Only the first few replies are embedded; the rest are paged in on demand
+        const paged = loadedReplies[comment.id];
+        const replies = paged ? paged.replies : comment.replies;
+        const hasMoreReplies = paged ? paged.next !== null : replies.length < comment.replies_count;
 
         return (
             <div className={`${isReply ? 'ml-12 mt-2' : 'mt-4'}`}>
@@ -273,7 +296,15 @@ export function Comments({ taskId }: CommentsProps) {
                                     </div>
                                 </div>
                             ) : (
-                                <p className="text-sm whitespace-pre-wrap">{comment.content}</p>
+                                comment.content_html ? (
+                                    // Pre-rendered and escaped by the server, mentions resolved
+                                    <p
+                                        className="text-sm whitespace-pre-wrap [&_.mention]:font-medium [&_.mention]:text-primary"
+                                        dangerouslySetInnerHTML={{ __html: comment.content_html }}
+                                    />
+                                ) : (
+                                    <p className="text-sm whitespace-pre-wrap">{comment.content}</p>
+                                )
                             )}
                         </div>
                         {!isReply && (
@@ -312,15 +343,27 @@ export function Comments({ taskId }: CommentsProps) {
                                 </div>
                             </div>
                         )}
-                        {comment.replies && comment.replies.length > 0 && (
+                        {replies && replies.length > 0 && (
                             <div className="mt-2">
-                                {comment.replies
+                                {replies
                                     .filter((reply, index, self) => index === self.findIndex(r => r.id === reply.id))
                                     .map((reply) => (
                                         <CommentItem key={`reply-${reply.id}`} comment={reply} isReply />
                                     ))}
                             </div>
                         )}
+                        {!isReply && hasMoreReplies && (
+                            <Button
+                                variant="link"
+                                size="sm"
+                                className="ml-12 h-7 text-xs"
+                                onClick={() => loadMoreReplies(comment.id)}
+                            >
+                                {paged
+                                    ? 'Show more replies'
+                                    : `View all ${comment.replies_count} replies`}
+                            </Button>
+                        )}
                     </div>
                 </div>
             </div>
@@ -22,21 +22,69 @@ export function NotificationBell() {
 
     useEffect(() => {
         loadNotifications();
-        // Poll for new notifications every 30 seconds
-        const interval = setInterval(loadNotifications, 30000);
-        return () => clearInterval(interval);
+
+        // While the push stream is unavailable, keep one long-poll request
+        // open instead of polling on a timer. Each loop owns a generation;
+        // stopping or starting another bumps it, so an older loop exits
+        // after its pending request instead of running alongside.
+        let generation = 0;
+        let pollingGeneration: number | null = null;
+        let closed = false;
+        let lastId = 0;
+        let count: number | undefined;
+        const longPoll = async () => {
+            if (pollingGeneration === generation) return;
+            const current = ++generation;
+            pollingGeneration = current;
+            while (generation === current && !closed) {
+                try {
+                    const bell = await notificationService.getBell({ since: lastId, count, wait: 25 });
+                    if (generation !== current) break;
+                    lastId = bell.last_id;
+                    count = bell.count;
+                    setNotifications(bell.results);
+                    setUnreadCount(bell.count);
+                    if (bell.retry_after) {
+                        await new Promise((resolve) => setTimeout(resolve, bell.retry_after! * 1000));
+                    }
+                } catch (error) {
+                    console.error('Error polling notifications:', error);
+                    await new Promise((resolve) => setTimeout(resolve, 30000));
+                }
+            }
+        };
+        const stopPolling = () => {
+            generation++;
+        };
+
+        const source = notificationService.openStream();
+        source.onopen = stopPolling;
+        source.onerror = () => {
+            longPoll();
+        };
+        source.addEventListener('unread_count', (event) => {
+            setUnreadCount(JSON.parse((event as MessageEvent).data).count);
+        });
+        source.addEventListener('notification', (event) => {
+            const notification: Notification = JSON.parse((event as MessageEvent).data);
+            setNotifications((prev) =>
+                [notification, ...prev.filter((n) => n.id !== notification.id)].slice(0, 10)
+            );
+        });
+
+        return () => {
+            closed = true;
+            source.close();
+            stopPolling();
+        };
     }, []);
 
     const loadNotifications = async () => {
         try {
-            const [notifsResponse, count] = await Promise.all([
-                notificationService.getNotifications(),
-                notificationService.getUnreadCount(),
-            ]);
-            // Handle paginated response - API returns { results: [], count: n }
-            const notifs = Array.isArray(notifsResponse) ? notifsResponse : (notifsResponse.results || []);
-            setNotifications(notifs.slice(0, 10)); // Show latest 10
-            setUnreadCount(count);
+            // Latest 10 and the unread count in one request
+            const bell = await notificationService.getBell();
+            setNotifications(bell.results);
+            setUnreadCount(bell.count);
         } catch (error) {
             console.error('Error loading notifications:', error);
         }
@@ -115,6 +163,8 @@ export function NotificationBell() {
                 return '🔄';
             case 'project_added':
                 return '➕';
+            case 'digest':
+                return '🗞️';
             default:
                 return '🔔';
         }
@@ -168,7 +218,14 @@ export function NotificationBell() {
                                 <div className="flex gap-3 w-full">
                                     <div className="text-lg">{getNotificationIcon(notification.notification_type)}</div>
                                     <div className="flex-1 min-w-0">
-                                        <p className="text-sm font-medium">{notification.message}</p>
+                                        <p className="text-sm font-medium">
+                                            {notification.message}
+                                            {notification.occurrences > 1 && (
+                                                <span className="ml-1 text-xs text-muted-foreground">
+                                                    ×{notification.occurrences}
+                                                </span>
+                                            )}
+                                        </p>
                                         {notification.task_title && (
                                             <p className="text-xs text-muted-foreground truncate">
                                                 {notification.task_title}
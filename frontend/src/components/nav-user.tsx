@@ -47,7 +47,7 @@ export function NavUser({
     if (!user) return null;
 
     const displayName = user.first_name || user.username;
-    const avatarUrl = getMediaUrl(user.profile_picture);
+    const avatarUrl = getMediaUrl(user.profile_thumbnail || user.profile_picture);
     const initials = displayName.substring(0, 2).toUpperCase();
 
     return (
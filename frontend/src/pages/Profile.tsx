@@ -18,6 +18,7 @@ import { User, Mail, Phone, Camera, Save, Lock, Loader2, Trash2 } from 'lucide-r
 import toast from 'react-hot-toast';
 import { getMediaUrl } from '@/lib/utils';
 import InputError from '@/components/ui/input-error';
+import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 
 export default function Profile() {
     const navigate = useNavigate();
@@ -34,6 +35,7 @@ export default function Profile() {
         last_name: '',
         email: '',
         phone: '',
+        notification_digest: 'off',
     });
 
     const [passwordData, setPasswordData] = useState({
@@ -59,6 +61,7 @@ export default function Profile() {
                 last_name: user.last_name || '',
                 email: user.email || '',
                 phone: user.phone || '',
+                notification_digest: user.notification_digest || 'off',
             });
 
             if (user.profile_picture) {
@@ -291,6 +294,23 @@ export default function Profile() {
                                 </div>
                             </div>
 
+                            <div className="space-y-2">
+                                <Label htmlFor="notification_digest">Notification Digest</Label>
+                                <Select
+                                    value={profileData.notification_digest}
+                                    onValueChange={(value) => setProfileData({ ...profileData, notification_digest: value })}
+                                >
+                                    <SelectTrigger id="notification_digest" className="w-full">
+                                        <SelectValue />
+                                    </SelectTrigger>
+                                    <SelectContent>
+                                        <SelectItem value="off">Off (notify me of every update)</SelectItem>
+                                        <SelectItem value="hourly">Hourly summary</SelectItem>
+                                        <SelectItem value="daily">Daily summary</SelectItem>
+                                    </SelectContent>
+                                </Select>
+                            </div>
+
                             <Button type="submit" disabled={isLoading} className="w-full bg-violet-800 hover:bg-violet-700">
                                 {isLoading ? (
                                     <>
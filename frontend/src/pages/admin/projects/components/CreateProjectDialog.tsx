@@ -233,7 +233,7 @@ export function CreateProjectDialog({ open, onOpenChange, onSuccess }: CreatePro
                                                     }}
                                                 />
                                                 <Avatar className="h-8 w-8">
-                                                    <AvatarImage src={getMediaUrl(user.profile_picture)} />
+                                                    <AvatarImage src={getMediaUrl(user.profile_thumbnail || user.profile_picture)} />
                                                     <AvatarFallback>
                                                         {user.first_name?.[0]}{user.last_name?.[0]}
                                                     </AvatarFallback>
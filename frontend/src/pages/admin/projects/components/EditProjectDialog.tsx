@@ -235,7 +235,7 @@ export function EditProjectDialog({ open, onOpenChange, project, onSuccess }: Ed
                                                     }}
                                                 />
                                                 <Avatar className="h-8 w-8">
-                                                    <AvatarImage src={getMediaUrl(user.profile_picture)} />
+                                                    <AvatarImage src={getMediaUrl(user.profile_thumbnail || user.profile_picture)} />
                                                     <AvatarFallback>
                                                         {user.first_name?.[0]}{user.last_name?.[0]}
                                                     </AvatarFallback>
@@ -7,7 +7,7 @@ import { Textarea } from '@/components/ui/textarea';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Loader2, Trash2, UserPlus, ChevronLeft, Users, Info, Save } from 'lucide-react';
 import { projectService, type Project } from '@/api/project.service';
-import { userService } from '@/api/user.service';
+import { userService, type UserMatch } from '@/api/user.service';
 import toast from 'react-hot-toast';
 import { useAuth } from '@/contexts/AuthContext';
 import { useProjectRefresh } from '@/contexts/ProjectContext';
@@ -25,7 +25,8 @@ export default function ProjectSettingsPage() {
     const [loading, setLoading] = useState(true);
     const [saving, setSaving] = useState(false);
     const [deleting, setDeleting] = useState(false);
-    const [allUsers, setAllUsers] = useState<any[]>([]);
+    const [availableUsers, setAvailableUsers] = useState<UserMatch[]>([]);
+    const [memberQuery, setMemberQuery] = useState('');
     const [selectedUser, setSelectedUser] = useState('');
     const [addingMember, setAddingMember] = useState(false);
     const [formData, setFormData] = useState({
@@ -38,10 +39,16 @@ export default function ProjectSettingsPage() {
     useEffect(() => {
         if (projectId) {
             loadProject();
-            loadUsers();
         }
     }, [projectId]);
 
+    // Server-side typeahead; debounced so typing does not flood the API
+    useEffect(() => {
+        if (!projectId) return;
+        const timer = setTimeout(() => loadUsers(memberQuery), 200);
+        return () => clearTimeout(timer);
+    }, [projectId, memberQuery, project?.members?.length]);
+
     const loadProject = async () => {
         if (!projectId) return;
         try {
@@ -70,10 +77,11 @@ export default function ProjectSettingsPage() {
         }
     };
 
-    const loadUsers = async () => {
+    const loadUsers = async (query: string) => {
+        if (!projectId) return;
         try {
-            const data = await userService.getAvailableUsers();
-            setAllUsers(data);
+            const data = await userService.autocompleteUsers(query, { project: parseInt(projectId) });
+            setAvailableUsers(data);
         } catch (error) {
             console.error('Error loading users:', error);
         }
@@ -180,10 +188,6 @@ export default function ProjectSettingsPage() {
         return null;
     }
 
-    const availableUsers = allUsers.filter(
-        u => !project.members?.includes(u.id) && u.id !== project.created_by
-    );
-
     return (
         <div className="h-full flex flex-col">
             {/* Header */}
@@ -331,6 +335,11 @@ export default function ProjectSettingsPage() {
                                 <div className="flex items-center justify-between">
                                     <div className="flex justify-between flex-col w-full">
                                         <div className="flex gap-2">
+                                            <Input
+                                                placeholder="Search by name, username or email"
+                                                value={memberQuery}
+                                                onChange={(e) => setMemberQuery(e.target.value)}
+                                            />
                                             <Select value={selectedUser} onValueChange={setSelectedUser}>
                                                 <SelectTrigger className="w-full">
                                                     <SelectValue placeholder="Select a member to add" />
@@ -8,6 +8,8 @@ export interface User {
   phone: string | null;
   role: 'admin' | 'user';
   profile_picture: string | null;
+  profile_thumbnail?: string | null;
+  notification_digest?: 'off' | 'hourly' | 'daily';
   date_joined: string;
   last_login?: string;
 }
@@ -45,5 +47,6 @@ export interface UpdateProfileData {
   first_name?: string;
   last_name?: string;
   phone?: string;
+  notification_digest?: 'off' | 'hourly' | 'daily';
   profile_picture?: File | null;
 }